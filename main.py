@@ -14,8 +14,10 @@ from astrbot.api.star import Context, Star, register
 from astrbot.core.star.filter.permission import PermissionType
 
 from .src.commands.dialogue_poll import (
+    DIALOGUE_POLL_RESPONSE_FORMAT,
     DialoguePollHandler,
     _import_matrix_adapter_module,
+    reset_send_poll_cache,
 )
 from .src.commands.group_analysis import GroupAnalysisHandler
 from .src.commands.personal_report import PersonalReportHandler
@@ -219,6 +221,10 @@ class matrixGroupDailyAnalysis(Star):
             if self.retry_manager:
                 await self.retry_manager.stop()
 
+            # 关闭 PDF 转换复用的常驻浏览器
+            if self.report_generator:
+                await self.report_generator.aclose()
+
             try:
                 from .src.utils.pdf_utils import PDFInstaller
 
@@ -499,7 +505,7 @@ class matrixGroupDailyAnalysis(Star):
             if guidance_text:
                 prompt = (
                     f"{prompt}\n\n补充要求：\n{guidance_text}\n"
-                    "注意：仍需只输出 JSON 数组。"
+                    "注意：仍需只输出 JSON 对象。"
                 )
             max_tokens = self.config_manager.get_dialogue_poll_max_tokens()
             llm_resp = await call_provider_with_retry(
@@ -510,6 +516,7 @@ class matrixGroupDailyAnalysis(Star):
                 temperature=0.9,
                 umo=event.unified_msg_origin,
                 provider_id_key="dialogue_poll_provider_id",
+                response_format=DIALOGUE_POLL_RESPONSE_FORMAT,
             )
             if not llm_resp:
                 yield event.plain_result("❌ LLM 生成失败，请稍后重试")
@@ -842,6 +849,8 @@ class matrixGroupDailyAnalysis(Star):
                 await self.auto_scheduler.restart_scheduler()
 
         elif action == "reload":
+            self.config_manager.reload_config()
+            reset_send_poll_cache()
             await self.auto_scheduler.restart_scheduler()
             yield event.plain_result("✅ 已重新加载配置并重启定时任务")
 
@@ -166,9 +166,7 @@ async def debug_render(
     # 4. Render Main Template
     # We'll test the image template
     html_templates = HTMLTemplates(config_manager)
-    raw_template = html_templates.get_image_template()
-
-    final_html = generator._render_html_template(raw_template, render_payload)
+    final_html = await html_templates.render_image_template(render_payload)
 
     # 5. Save to file
     output_path = Path(output_file)
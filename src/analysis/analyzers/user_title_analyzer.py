@@ -173,7 +173,7 @@ class UserTitleAnalyzer(BaseAnalyzer):
                 target_user_ids = {
                     user_id
                     for user_id, stats in user_analysis.items()
-                    if stats["message_count"] >= 5
+                    if stats.message_count >= 5
                 }
 
             for user_id, stats in user_analysis.items():
@@ -187,31 +187,31 @@ class UserTitleAnalyzer(BaseAnalyzer):
                     continue
 
                 # 分析用户特征
-                night_messages = sum(stats["hours"][h] for h in range(6))
+                night_messages = sum(stats.hours[0:6])
                 avg_chars = (
-                    stats["char_count"] / stats["message_count"]
-                    if stats["message_count"] > 0
+                    stats.char_count / stats.message_count
+                    if stats.message_count > 0
                     else 0
                 )
 
                 user_summaries.append(
                     {
-                        "name": stats["nickname"],
+                        "name": stats.nickname,
                         "matrix": str(user_id),
-                        "message_count": stats["message_count"],
+                        "message_count": stats.message_count,
                         "avg_chars": round(avg_chars, 1),
                         "emoji_ratio": round(
-                            stats["emoji_count"] / stats["message_count"], 2
+                            stats.emoji_count / stats.message_count, 2
                         )
-                        if stats["message_count"] > 0
+                        if stats.message_count > 0
                         else 0,
-                        "night_ratio": round(night_messages / stats["message_count"], 2)
-                        if stats["message_count"] > 0
+                        "night_ratio": round(night_messages / stats.message_count, 2)
+                        if stats.message_count > 0
                         else 0,
                         "reply_ratio": round(
-                            stats["reply_count"] / stats["message_count"], 2
+                            stats.reply_count / stats.message_count, 2
                         )
-                        if stats["message_count"] > 0
+                        if stats.message_count > 0
                         else 0,
                     }
                 )
@@ -3,9 +3,10 @@
 负责用户活跃度分析和其他统计功能
 """
 
-from collections import defaultdict
+import sys
 
-from ..utils.time_utils import get_hour_from_timestamp
+from ..models.data_models import UserStat
+from ..utils.time_utils import get_hours_from_timestamps
 from .utils import InfoUtils
 
 
@@ -15,53 +16,53 @@ class UserAnalyzer:
     def __init__(self, config_manager):
         self.config_manager = config_manager
 
-    def analyze_users(self, messages: list[dict]) -> dict[str, dict]:
+    def analyze_users(self, messages: list[dict]) -> dict[str, UserStat]:
         """分析用户活跃度"""
         # 获取机器人 matrix 号列表用于过滤
         bot_matrix_ids = self.config_manager.get_bot_matrix_ids()
         bot_matrix_id_set = {str(matrix) for matrix in bot_matrix_ids if matrix}
 
-        user_stats = defaultdict(
-            lambda: {
-                "message_count": 0,
-                "char_count": 0,
-                "emoji_count": 0,
-                "nickname": "",
-                "hours": defaultdict(int),
-                "reply_count": 0,
-                "thread_message_count": 0,
-            }
+        user_stats: dict[str, UserStat] = {}
+
+        # 批量预先计算每条消息的小时，避免逐条构造 datetime
+        hours = get_hours_from_timestamps(
+            msg.get("time", 0) if isinstance(msg, dict) else 0 for msg in messages
         )
 
-        for msg in messages:
+        for msg, hour in zip(messages, hours):
             if not isinstance(msg, dict):
                 continue
             sender = msg.get("sender", {})
             if not isinstance(sender, dict):
                 continue
-            user_id = str(sender.get("user_id", ""))
+            # 同一用户会发送大量消息，驻留字符串让字典查找走指针比较快路径
+            user_id = sys.intern(str(sender.get("user_id") or ""))
 
             # 跳过机器人自己的消息，避免进入统计
             if bot_matrix_id_set and user_id in bot_matrix_id_set:
                 continue
 
-            nickname = InfoUtils.get_user_nickname(self.config_manager, sender)
+            nickname = sys.intern(
+                str(InfoUtils.get_user_nickname(self.config_manager, sender) or "")
+            )
 
-            user_stats[user_id]["message_count"] += 1
-            user_stats[user_id]["nickname"] = nickname
+            stats = user_stats.get(user_id)
+            if stats is None:
+                stats = user_stats[user_id] = UserStat()
+            stats.message_count += 1
+            stats.nickname = nickname
 
             # 使用标准化字段补充回复计数（适配非文本消息中的 reply 语义）
             if str(msg.get("reply_event_id", "") or "").strip():
-                user_stats[user_id]["reply_count"] += 1
+                stats.reply_count += 1
 
             relation_type = str(msg.get("relation_type", "") or "").strip().lower()
             thread_root_id = str(msg.get("thread_root_id", "") or "").strip()
             if relation_type == "m.thread" and thread_root_id:
-                user_stats[user_id]["thread_message_count"] += 1
+                stats.thread_message_count += 1
 
             # 统计时间分布
-            hour = get_hour_from_timestamp(msg.get("time", 0))
-            user_stats[user_id]["hours"][hour] += 1
+            stats.hours[hour] += 1
 
             # 处理消息内容
             message_items = msg.get("message", [])
@@ -75,34 +76,34 @@ class UserAnalyzer:
                     data = {}
                 if content.get("type") == "text":
                     text = data.get("text", "")
-                    user_stats[user_id]["char_count"] += len(text)
+                    stats.char_count += len(text)
                 elif content.get("type") == "face":
                     # matrix 基础表情
-                    user_stats[user_id]["emoji_count"] += 1
+                    stats.emoji_count += 1
                 elif content.get("type") == "mface":
                     # 动画表情/魔法表情
-                    user_stats[user_id]["emoji_count"] += 1
+                    stats.emoji_count += 1
                 elif content.get("type") == "bface":
                     # 超级表情
-                    user_stats[user_id]["emoji_count"] += 1
+                    stats.emoji_count += 1
                 elif content.get("type") == "sface":
                     # 小表情
-                    user_stats[user_id]["emoji_count"] += 1
+                    stats.emoji_count += 1
                 elif content.get("type") == "image":
                     # 检查是否是动画表情（通过 summary 字段判断）
                     summary = data.get("summary", "")
                     if "动画表情" in summary or "表情" in summary:
                         # 动画表情（以 image 形式发送）
-                        user_stats[user_id]["emoji_count"] += 1
+                        stats.emoji_count += 1
                 elif content.get("type") == "reply":
                     # 兼容旧数据：若无标准化字段，则退回 message 列表中的 reply 计数
                     if not str(msg.get("reply_event_id", "") or "").strip():
-                        user_stats[user_id]["reply_count"] += 1
+                        stats.reply_count += 1
 
-        return dict(user_stats)
+        return user_stats
 
     def get_top_users(
-        self, user_analysis: dict[str, dict], limit: int = 10
+        self, user_analysis: dict[str, UserStat], limit: int = 10
     ) -> list[dict]:
         """获取最活跃的用户"""
         # 获取机器人 matrix 号列表用于过滤
@@ -118,12 +119,12 @@ class UserAnalyzer:
             users.append(
                 {
                     "user_id": user_id,
-                    "nickname": stats["nickname"],
-                    "message_count": stats["message_count"],
-                    "char_count": stats["char_count"],
-                    "emoji_count": stats["emoji_count"],
-                    "reply_count": stats["reply_count"],
-                    "thread_message_count": stats.get("thread_message_count", 0),
+                    "nickname": stats.nickname,
+                    "message_count": stats.message_count,
+                    "char_count": stats.char_count,
+                    "emoji_count": stats.emoji_count,
+                    "reply_count": stats.reply_count,
+                    "thread_message_count": stats.thread_message_count,
                 }
             )
 
@@ -132,26 +133,28 @@ class UserAnalyzer:
         return users[:limit]
 
     def get_user_activity_pattern(
-        self, user_analysis: dict[str, dict], user_id: str
+        self, user_analysis: dict[str, UserStat], user_id: str
     ) -> dict:
         """获取用户活动模式"""
         if user_id not in user_analysis:
             return {}
 
         stats = user_analysis[user_id]
-        hours = stats["hours"]
+        hours = stats.hours
 
         # 找出最活跃的时间段
-        most_active_hour = max(hours.items(), key=lambda x: x[1])[0] if hours else 0
+        most_active_hour = max(range(24), key=hours.__getitem__) if any(hours) else 0
 
         # 计算夜间活跃度
-        night_messages = sum(hours[h] for h in range(0, 6))
+        night_messages = sum(hours[0:6])
         night_ratio = (
-            night_messages / stats["message_count"] if stats["message_count"] > 0 else 0
+            night_messages / stats.message_count if stats.message_count > 0 else 0
         )
 
         return {
             "most_active_hour": most_active_hour,
             "night_ratio": night_ratio,
-            "hourly_distribution": dict(hours),
+            "hourly_distribution": {
+                hour: count for hour, count in enumerate(hours) if count
+            },
         }
@@ -8,6 +8,78 @@ import re
 
 from astrbot.api import logger
 
+# 提取器使用的正则在模块加载时预编译，避免每次调用重复查找 re 缓存
+_TOPIC_RE = re.compile(
+    r'\{\s*"topic":\s*"([^"]+)"\s*,\s*"contributors":\s*\[([^\]]+)\]\s*,\s*"detail":\s*"([^"]*(?:\\.[^"]*)*)"\s*\}',
+    re.DOTALL,
+)
+_TOPIC_LOOSE_RE = re.compile(
+    r'"topic":\s*"([^"]+)"[^}]*"contributors":\s*\[([^\]]+)\][^}]*"detail":\s*"([^"]*(?:\\.[^"]*)*)"',
+    re.DOTALL,
+)
+_USER_TITLE_RE = re.compile(
+    r'\{\s*"name"\s*:\s*"(?P<name>[^"]+)"\s*,\s*"matrix"\s*:\s*'
+    r'(?P<matrix>"[^"]+"|\d+)\s*,\s*"title"\s*:\s*"(?P<title>[^"]+)"\s*,\s*'
+    r'"mbti"\s*:\s*"(?P<mbti>[^"]+)"\s*,\s*"reason"\s*:\s*"(?P<reason>[^"]*(?:\\.[^"]*)*)"\s*\}',
+    re.DOTALL,
+)
+_USER_TITLE_LOOSE_RE = re.compile(
+    r'"name"\s*:\s*"(?P<name>[^"]+)"[^}]*"matrix"\s*:\s*'
+    r'(?P<matrix>"[^"]+"|\d+)[^}]*"title"\s*:\s*"(?P<title>[^"]+)"[^}]*'
+    r'"mbti"\s*:\s*"(?P<mbti>[^"]+)"[^}]*"reason"\s*:\s*"(?P<reason>[^"]*(?:\\.[^"]*)*)"',
+    re.DOTALL,
+)
+_GOLDEN_QUOTE_RE = re.compile(
+    r'\{\s*"content":\s*"([^"]*(?:\\.[^"]*)*)"\s*,\s*"sender":\s*"([^"]+)"\s*,\s*"reason":\s*"([^"]*(?:\\.[^"]*)*)"\s*\}',
+    re.DOTALL,
+)
+_GOLDEN_QUOTE_LOOSE_RE = re.compile(
+    r'"content":\s*"([^"]*(?:\\.[^"]*)*)"[^}]*"sender":\s*"([^"]+)"[^}]*"reason":\s*"([^"]*(?:\\.[^"]*)*)"',
+    re.DOTALL,
+)
+_QUOTED_RE = re.compile(r'"([^"]+)"')
+# 字符串结束引号之后允许出现的结构字符
+_STRING_TERMINATORS = frozenset(",:}]")
+
+
+def _escape_inner_quotes(text: str) -> str:
+    """
+    单次线性扫描，转义字符串值内部未转义的双引号
+
+    引号之后（忽略空格）紧跟结构字符或文本结束时视为字符串结束，
+    否则视为字符串内容中的裸引号并转义。
+    """
+    out = []
+    in_string = False
+    escaped = False
+    length = len(text)
+    for i, ch in enumerate(text):
+        if not in_string:
+            if ch == '"':
+                in_string = True
+            out.append(ch)
+            continue
+        if escaped:
+            escaped = False
+            out.append(ch)
+            continue
+        if ch == "\\":
+            escaped = True
+            out.append(ch)
+            continue
+        if ch != '"':
+            out.append(ch)
+            continue
+        j = i + 1
+        while j < length and text[j] == " ":
+            j += 1
+        if j >= length or text[j] in _STRING_TERMINATORS:
+            in_string = False
+            out.append(ch)
+        else:
+            out.append('\\"')
+    return "".join(out)
+
 
 def fix_json(text: str) -> str:
     """
@@ -20,6 +92,13 @@ def fix_json(text: str) -> str:
         修复后的 JSON 文本
     """
     try:
+        # 0. 已经是合法 JSON 时直接返回，避免修复步骤破坏原有内容
+        try:
+            json.loads(text)
+            return text.strip()
+        except ValueError:
+            pass
+
         # 1. 移除 markdown 代码块标记
         text = re.sub(r"```json\s*", "", text)
         text = re.sub(r"```\s*$", "", text)
@@ -41,15 +120,8 @@ def fix_json(text: str) -> str:
         text = text.replace("【", "[").replace("】", "]")
 
         # 4. 处理字符串内容中的特殊字符
-        # 转义字符串内的双引号
-        def escape_quotes_in_strings(match):
-            content = match.group(1)
-            # 转义内部的双引号
-            content = content.replace('"', '\\"')
-            return f'"{content}"'
-
-        # 先处理字段值中的引号
-        text = re.sub(r'"([^"]*(?:"[^"]*)*)"', escape_quotes_in_strings, text)
+        # 转义字符串内未转义的双引号（线性扫描，不会重复转义已合法的引号）
+        text = _escape_inner_quotes(text)
 
         # 5. 修复截断的 JSON
         if not text.endswith("]"):
@@ -139,13 +211,11 @@ def extract_topics_with_regex(result_text: str, max_topics: int) -> list[dict]:
     try:
         # 更强的正则表达式提取话题信息，处理转义字符
         # 匹配每个完整的话题对象
-        topic_pattern = r'\{\s*"topic":\s*"([^"]+)"\s*,\s*"contributors":\s*\[([^\]]+)\]\s*,\s*"detail":\s*"([^"]*(?:\\.[^"]*)*)"\s*\}'
-        matches = re.findall(topic_pattern, result_text, re.DOTALL)
+        matches = _TOPIC_RE.findall(result_text)
 
         if not matches:
             # 尝试更宽松的匹配
-            topic_pattern = r'"topic":\s*"([^"]+)"[^}]*"contributors":\s*\[([^\]]+)\][^}]*"detail":\s*"([^"]*(?:\\.[^"]*)*)"'
-            matches = re.findall(topic_pattern, result_text, re.DOTALL)
+            matches = _TOPIC_LOOSE_RE.findall(result_text)
 
         topics = []
         for match in matches[:max_topics]:
@@ -159,7 +229,7 @@ def extract_topics_with_regex(result_text: str, max_topics: int) -> list[dict]:
             # 解析参与者列表
             contributors = [
                 contrib.strip()
-                for contrib in re.findall(r'"([^"]+)"', contributors_str)
+                for contrib in _QUOTED_RE.findall(contributors_str)
             ] or ["群友"]
 
             topics.append(
@@ -193,21 +263,11 @@ def extract_user_titles_with_regex(result_text: str, max_count: int) -> list[dic
         titles = []
 
         # 正则模式：匹配完整的用户称号对象（matrix 支持字符串或数字）
-        pattern = (
-            r'\{\s*"name"\s*:\s*"(?P<name>[^"]+)"\s*,\s*"matrix"\s*:\s*'
-            r'(?P<matrix>"[^"]+"|\d+)\s*,\s*"title"\s*:\s*"(?P<title>[^"]+)"\s*,\s*'
-            r'"mbti"\s*:\s*"(?P<mbti>[^"]+)"\s*,\s*"reason"\s*:\s*"(?P<reason>[^"]*(?:\\.[^"]*)*)"\s*\}'
-        )
-        matches = list(re.finditer(pattern, result_text, re.DOTALL))
+        matches = list(_USER_TITLE_RE.finditer(result_text))
 
         if not matches:
             # 尝试更宽松的匹配（字段顺序可变）
-            pattern = (
-                r'"name"\s*:\s*"(?P<name>[^"]+)"[^}]*"matrix"\s*:\s*'
-                r'(?P<matrix>"[^"]+"|\d+)[^}]*"title"\s*:\s*"(?P<title>[^"]+)"[^}]*'
-                r'"mbti"\s*:\s*"(?P<mbti>[^"]+)"[^}]*"reason"\s*:\s*"(?P<reason>[^"]*(?:\\.[^"]*)*)"'
-            )
-            matches = list(re.finditer(pattern, result_text, re.DOTALL))
+            matches = list(_USER_TITLE_LOOSE_RE.finditer(result_text))
 
         for match in matches[:max_count]:
             name = match.group("name").strip()
@@ -253,13 +313,11 @@ def extract_golden_quotes_with_regex(result_text: str, max_count: int) -> list[d
         quotes = []
 
         # 正则模式：匹配完整的金句对象
-        pattern = r'\{\s*"content":\s*"([^"]*(?:\\.[^"]*)*)"\s*,\s*"sender":\s*"([^"]+)"\s*,\s*"reason":\s*"([^"]*(?:\\.[^"]*)*)"\s*\}'
-        matches = re.findall(pattern, result_text, re.DOTALL)
+        matches = _GOLDEN_QUOTE_RE.findall(result_text)
 
         if not matches:
             # 尝试更宽松的匹配（字段顺序可变）
-            pattern = r'"content":\s*"([^"]*(?:\\.[^"]*)*)"[^}]*"sender":\s*"([^"]+)"[^}]*"reason":\s*"([^"]*(?:\\.[^"]*)*)"'
-            matches = re.findall(pattern, result_text, re.DOTALL)
+            matches = _GOLDEN_QUOTE_LOOSE_RE.findall(result_text)
 
         for match in matches[:max_count]:
             content = match[0].strip()
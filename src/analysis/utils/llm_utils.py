@@ -178,6 +178,7 @@ async def call_provider_with_retry(
     temperature: float,
     umo: str = None,
     provider_id_key: str = None,
+    response_format: dict | None = None,
 ) -> Any | None:
     """
     调用 LLM 提供者，带超时、重试与退避。支持自定义服务商和配置化 Provider 选择。
@@ -190,6 +191,7 @@ async def call_provider_with_retry(
         temperature: 采样温度
         umo: 指定使用的模型唯一标识符
         provider_id_key: 配置中的 provider_id 键名（如 'topic_provider_id'），用于选择特定的 Provider
+        response_format: 结构化输出约束（如 JSON Schema），Provider 不支持时自动忽略
 
     Returns:
         LLM 生成的结果，失败时返回 None
@@ -232,15 +234,33 @@ async def call_provider_with_retry(
             # 取决于 AstrBot 版本和具体实现。如果支持 kwargs，可以传递。
             # 这里假设支持 kwargs 传递给底层 provider。
             # 使用 asyncio.wait_for 包裹，继续遵守 timeout 参数并在超时时抛出 TimeoutError。
-            llm_resp = await asyncio.wait_for(
-                context.llm_generate(
-                    chat_provider_id=provider_id,
-                    prompt=prompt,
-                    max_tokens=max_tokens,
-                    temperature=temperature,
-                ),
-                timeout=timeout,
-            )
+            generate_kwargs = {
+                "chat_provider_id": provider_id,
+                "prompt": prompt,
+                "max_tokens": max_tokens,
+                "temperature": temperature,
+            }
+            if response_format:
+                generate_kwargs["response_format"] = response_format
+            try:
+                llm_resp = await asyncio.wait_for(
+                    context.llm_generate(**generate_kwargs),
+                    timeout=timeout,
+                )
+            except asyncio.TimeoutError:
+                raise
+            except Exception as e:
+                if "response_format" not in generate_kwargs:
+                    raise
+                # AstrBot 不接受 response_format，或 Provider 拒绝该 Schema
+                # （如仅支持 json_object），立即回退普通调用，后续重试也不再携带
+                logger.info(f"结构化输出请求失败，回退普通调用：{e}")
+                response_format = None
+                generate_kwargs.pop("response_format")
+                llm_resp = await asyncio.wait_for(
+                    context.llm_generate(**generate_kwargs),
+                    timeout=timeout,
+                )
 
             return llm_resp
 
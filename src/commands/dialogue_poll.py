@@ -11,14 +11,52 @@ from astrbot.api import logger
 DEFAULT_DIALOGUE_POLL_PROMPT = (
     "你是群聊文风模仿器。根据下面的聊天记录，生成一个单选投票：给出一个简短的问题 (question)，"
     "以及 {option_count} 条候选发言 (options)。候选发言必须是'嘎啦给目'风格，语气俏皮、有点碎碎念，但不要冒犯。"
-    "不要@具体用户，不要包含隐私或敏感信息。每条候选发言 6-20 字。只输出 JSON 数组，且只包含一个对象，"
-    '格式如下：[{"question":"...","options":["...","..."]}]。\\n\\n聊天记录：\\n{history_text}'
+    "不要@具体用户，不要包含隐私或敏感信息。每条候选发言 6-20 字。只输出一个 JSON 对象，"
+    '格式如下：{"question":"...","options":["...","..."]}。\\n\\n聊天记录：\\n{history_text}'
 )
 POLL_EVENT_TYPE_STABLE = "m.poll.start"
 POLL_POLL_KEY_STABLE = "m.poll"
 POLL_EVENT_TYPE_UNSTABLE = "org.matrix.msc3381.poll.start"
 POLL_POLL_KEY_UNSTABLE = "org.matrix.msc3381.poll.start"
 
+# 投票事件类型的默认尝试顺序：(event_type, poll_key, 日志标签)
+_POLL_TYPES = (
+    (POLL_EVENT_TYPE_UNSTABLE, POLL_POLL_KEY_UNSTABLE, "MSC3381"),
+    (POLL_EVENT_TYPE_STABLE, POLL_POLL_KEY_STABLE, "稳定事件类型"),
+)
+
+# 支持结构化输出的 Provider 使用该 JSON Schema 约束投票结果
+DIALOGUE_POLL_RESPONSE_FORMAT = {
+    "type": "json_schema",
+    "json_schema": {
+        "name": "dialogue_poll",
+        "strict": True,
+        "schema": {
+            "type": "object",
+            "required": ["question", "options"],
+            "additionalProperties": False,
+            "properties": {
+                "question": {"type": "string"},
+                "options": {
+                    "type": "array",
+                    "items": {"type": "string"},
+                },
+            },
+        },
+    },
+}
+
+# 只读的共享空字典，避免在热循环中为 .get 默认值反复分配
+_EMPTY_DICT: dict = {}
+
+# 复用同一个解码器实例（解析的各个阶段共用）
+_JSON_DECODER = json.JSONDecoder()
+
+_ARRAY_RE = re.compile(r"\[.*\]", re.DOTALL)
+_QUESTION_RE = re.compile(r'"question"\s*:\s*"([^"]+)"')
+_OPTIONS_RE = re.compile(r'"options"\s*:\s*\[([^\]]+)\]')
+_QUOTED_RE = re.compile(r'"([^"]+)"')
+
 
 def _safe_import(module_path: str):
     try:
@@ -40,87 +78,146 @@ def _import_matrix_adapter_module(module_path: str):
     return None
 
 
+_MISSING = object()
+# send_poll 的解析结果（函数或 None），_MISSING 表示尚未解析
+_SEND_POLL_FN = _MISSING
+
+
+def _get_send_poll():
+    """获取并缓存 Matrix 适配器的 send_poll 函数。"""
+    global _SEND_POLL_FN
+    if _SEND_POLL_FN is _MISSING:
+        poll_module = _import_matrix_adapter_module("sender.handlers.poll")
+        _SEND_POLL_FN = getattr(poll_module, "send_poll", None)
+    return _SEND_POLL_FN
+
+
+def reset_send_poll_cache() -> None:
+    """清除 send_poll 缓存，下次发送时重新解析适配器模块。"""
+    global _SEND_POLL_FN
+    _SEND_POLL_FN = _MISSING
+
+
 class DialoguePollHandler:
     """对话投票命令处理器"""
 
     def __init__(self, config_manager, bot_manager):
         self.config_manager = config_manager
         self.bot_manager = bot_manager
+        # (platform_id, room_id) -> 上次发送成功的投票事件类型
+        self._preferred_poll_type: dict[tuple, str] = {}
+        self._filter_cache: tuple | None = None
+        self._compiled_poll_tpl: tuple[str, list[list[str]]] | None = None
+
+    def _get_history_filters(self) -> tuple[tuple[str, ...], int, frozenset[str]]:
+        """获取规范化后的过滤前缀与过滤用户，配置未变时复用上次结果。"""
+        raw_prefixes = tuple(self.config_manager.get_history_filter_prefixes())
+        raw_users = tuple(self.config_manager.get_history_filter_users())
+        key = (raw_prefixes, raw_users)
+        cached = self._filter_cache
+        if cached is not None and cached[0] == key:
+            return cached[1]
+
+        # 去重并剔除被更短前缀覆盖的项（如已有 "/" 时的 "/cmd"），
+        # 使 str.startswith 的元组尽可能小
+        prefixes: tuple[str, ...] = ()
+        for prefix in sorted(
+            {
+                prefix.lower().strip()
+                for prefix in raw_prefixes
+                if isinstance(prefix, str) and prefix.strip()
+            },
+            key=len,
+        ):
+            if not prefixes or not prefix.startswith(prefixes):
+                prefixes += (prefix,)
+        # 前缀匹配只需比较文本开头，避免对长消息整体 lower()
+        prefix_window = max(map(len, prefixes), default=0)
+        user_filters = frozenset(
+            user.lower().strip()
+            for user in raw_users
+            if isinstance(user, str) and user.strip()
+        )
+        filters = (prefixes, prefix_window, user_filters)
+        self._filter_cache = (key, filters)
+        return filters
 
     def format_messages_for_dialogue_prompt(
         self, messages: list[dict], max_messages: int = 120
     ) -> str:
         """将消息整理为对话提示词文本。"""
-        prefixes = [
-            prefix.lower().strip()
-            for prefix in self.config_manager.get_history_filter_prefixes()
-            if isinstance(prefix, str) and prefix.strip()
+        prefixes, prefix_window, user_filters = self._get_history_filters()
+        # 过滤条件只与发送者有关的部分提前到消息级别判断
+        should_filter_bot = (
+            self.bot_manager.should_filter_bot_message
+            if self.config_manager.should_skip_history_bots() and self.bot_manager
+            else None
+        )
+        # 只需最近 max_messages 条：按时间从新到旧遍历，凑够即停止，
+        # 避免对将被丢弃的旧消息做文本提取与过滤
+        times = [
+            (msg.get("time", 0) or 0) if isinstance(msg, dict) else 0
+            for msg in messages
         ]
-        user_filters = {
-            user.lower().strip()
-            for user in self.config_manager.get_history_filter_users()
-            if isinstance(user, str) and user.strip()
-        }
-        skip_bot = self.config_manager.should_skip_history_bots()
-        entries: list[tuple[float, str, str]] = []
-        for msg in messages:
+        order = range(len(messages))
+        if any(prev > cur for prev, cur in zip(times, times[1:])):
+            # 稳定排序，同一时间戳保持原始先后顺序
+            order = sorted(order, key=times.__getitem__)
+
+        lines: list[str] = []
+        lines_append = lines.append
+        empty = _EMPTY_DICT
+        for index in reversed(order):
+            if len(lines) >= max_messages:
+                break
+            msg = messages[index]
             if not isinstance(msg, dict):
                 continue
-            sender_data = msg.get("sender", {})
+            sender_data = msg.get("sender") or empty
             if not isinstance(sender_data, dict):
-                sender_data = {}
-            sender = sender_data.get("nickname") or sender_data.get("user_id") or "匿名"
-            msg_time = msg.get("time", 0) or 0
+                sender_data = empty
             sender_id = str(sender_data.get("user_id") or "").strip()
-            message_items = msg.get("message", [])
-            if not isinstance(message_items, list):
-                continue
-            for content in message_items:
-                if not isinstance(content, dict):
+            if sender_id:
+                if should_filter_bot and should_filter_bot(sender_id):
                     continue
-                if content.get("type") != "text":
+                if user_filters and sender_id.lower() in user_filters:
                     continue
-                content_data = content.get("data", {})
-                if not isinstance(content_data, dict):
-                    content_data = {}
-                text = str(content_data.get("text", "") or "").strip()
-                if not text:
-                    continue
-                if self._should_skip_history_message(
-                    sender_id, text, prefixes, user_filters, skip_bot
-                ):
+            sender = sender_data.get("nickname") or sender_data.get("user_id") or "匿名"
+            message_items = msg.get("message")
+            if not isinstance(message_items, list):
+                continue
+            texts = [
+                text
+                for content in message_items
+                if isinstance(content, dict)
+                and content.get("type") == "text"
+                and isinstance(content_data := content.get("data"), dict)
+                and (text := str(content_data.get("text") or "").strip())
+            ]
+            for text in reversed(texts):
+                if prefixes and text[:prefix_window].lower().startswith(prefixes):
                     continue
                 if len(text) > 80:
                     text = text[:77] + "..."
-                entries.append((msg_time, sender, text))
+                lines_append(f"{sender}: {text}")
 
-        if not entries:
+        if not lines:
             return ""
 
-        entries.sort(key=lambda x: x[0])
-        recent = entries[-max_messages:]
-        lines = [f"{sender}: {text}" for _, sender, text in recent]
+        del lines[max_messages:]
+        lines.reverse()
         return "\n".join(lines)
 
-    def _should_skip_history_message(
-        self,
-        sender_id: str,
-        text: str,
-        prefixes: list[str],
-        user_filters: set[str],
-        skip_bot: bool,
-    ) -> bool:
-        """基于配置决定是否跳过该条历史消息。"""
-        if skip_bot and sender_id and self.bot_manager:
-            if self.bot_manager.should_filter_bot_message(sender_id):
-                return True
-        if sender_id and sender_id.lower() in user_filters:
-            return True
-        lower_text = text.lower().lstrip()
-        for prefix in prefixes:
-            if prefix and lower_text.startswith(prefix):
-                return True
-        return False
+    def _compile_poll_template(self, template: str) -> list[list[str]]:
+        """将提示词模板按占位符预先切分，模板未变化时复用。"""
+        cached = self._compiled_poll_tpl
+        if cached is not None and cached[0] == template:
+            return cached[1]
+        segments = [
+            part.split("{option_count}") for part in template.split("{history_text}")
+        ]
+        self._compiled_poll_tpl = (template, segments)
+        return segments
 
     def build_dialogue_poll_prompt(self, history_text: str, option_count: int) -> str:
         """构造对话投票的 LLM 提示词。"""
@@ -129,8 +226,10 @@ class DialoguePollHandler:
             or DEFAULT_DIALOGUE_POLL_PROMPT
         )
         try:
-            return template.replace("{option_count}", str(option_count)).replace(
-                "{history_text}", history_text
+            count_text = str(option_count)
+            return history_text.join(
+                count_text.join(parts)
+                for parts in self._compile_poll_template(template)
             )
         except Exception as e:
             logger.warning(f"对话投票提示词格式化失败，回退默认提示词：{e}")
@@ -144,18 +243,38 @@ class DialoguePollHandler:
 
         if not text:
             return None
-        match = re.search(r"\[.*\]", text, re.DOTALL)
+        # 结构化输出可直接解析，跳过正则提取与 JSON 修复
+        try:
+            data = _JSON_DECODER.decode(text)
+        except ValueError:
+            data = None
+        if isinstance(data, (dict, list)):
+            return self._extract_poll_from_data(data)
+        # 回复夹带说明文字时，从第一个 '{' 或 '['（取靠前者）起单次解码，
+        # 成功时无需正则提取与修复；对象在前时 '[' 只是其 options 数组
+        obj_start = text.find("{")
+        start = text.find("[")
+        if obj_start != -1 and (start == -1 or obj_start < start):
+            start = obj_start
+        if start != -1:
+            try:
+                data, _ = _JSON_DECODER.raw_decode(text, start)
+            except ValueError:
+                data = None
+            if isinstance(data, (dict, list)):
+                return self._extract_poll_from_data(data)
+        match = _ARRAY_RE.search(text)
         if not match:
             logger.warning("对话投票 JSON 匹配失败，未找到数组结构")
             return None
         json_text = fix_json(match.group())
         logger.debug(f"对话投票 JSON 修复后：{json_text}")
         try:
-            data = json.loads(json_text)
+            data = _JSON_DECODER.decode(json_text)
         except Exception as e:
             try:
                 json_text_alt = json_text.replace('\\"', '"')
-                data = json.loads(json_text_alt)
+                data = _JSON_DECODER.decode(json_text_alt)
             except Exception:
                 logger.warning(
                     f"对话投票 JSON 解析失败：{e} | raw={text} | cleaned={json_text}"
@@ -163,10 +282,17 @@ class DialoguePollHandler:
                 data = None
         if data is None:
             return None
-        if not isinstance(data, list) or not data:
-            logger.warning("对话投票 JSON 内容异常（非列表或空）")
-            return None
-        first = data[0] if isinstance(data[0], dict) else None
+        return self._extract_poll_from_data(data)
+
+    def _extract_poll_from_data(self, data) -> tuple[str, list[str]] | None:
+        """从已解析的 JSON（对象或仅含一个对象的数组）中提取 question/options。"""
+        if isinstance(data, dict):
+            first = data
+        else:
+            if not isinstance(data, list) or not data:
+                logger.warning("对话投票 JSON 内容异常（非列表或空）")
+                return None
+            first = data[0] if isinstance(data[0], dict) else None
         if not first:
             logger.warning("对话投票 JSON 第一个元素非对象或为空")
             return None
@@ -196,15 +322,15 @@ class DialoguePollHandler:
         self, text: str
     ) -> tuple[str, list[str]] | None:
         """在 JSON 解析失败时尝试关键词提取 question/options。"""
-        question_match = re.search(r'"question"\s*:\s*"([^"]+)"', text)
-        options_match = re.search(r'"options"\s*:\s*\[([^\]]+)\]', text)
+        question_match = _QUESTION_RE.search(text)
+        options_match = _OPTIONS_RE.search(text)
         if not question_match or not options_match:
             return None
         question = question_match.group(1).strip()
         candidate_block = options_match.group(1)
         options = []
         seen = set()
-        for item in re.findall(r'"([^"]+)"', candidate_block):
+        for item in _QUOTED_RE.findall(candidate_block):
             clean = item.strip()
             if not clean or clean in seen:
                 continue
@@ -227,6 +353,13 @@ class DialoguePollHandler:
         )
         return "\n".join(lines).strip()
 
+    def _ordered_poll_types(self, cache_key: tuple) -> list[tuple[str, str, str]]:
+        """返回投票事件类型的尝试顺序，上次成功的类型优先。"""
+        preferred = self._preferred_poll_type.get(cache_key)
+        if preferred is None:
+            return list(_POLL_TYPES)
+        return sorted(_POLL_TYPES, key=lambda t: t[0] != preferred)
+
     async def send_dialogue_poll_via_adapter(
         self,
         event,
@@ -236,14 +369,12 @@ class DialoguePollHandler:
         options: list[str],
     ) -> bool | None:
         """优先通过 Matrix 适配器直接发送投票。"""
+        cache_key = (platform_id, room_id)
         if hasattr(event, "client") and getattr(event, "client"):
             try:
-                poll_module = _import_matrix_adapter_module(
-                    "sender.handlers.poll",
-                )
-                if not poll_module or not hasattr(poll_module, "send_poll"):
+                _send_poll = _get_send_poll()
+                if _send_poll is None:
                     raise RuntimeError("Matrix adapter poll handler not available")
-                _send_poll = poll_module.send_poll
 
                 is_encrypted_room = False
                 if hasattr(event, "e2ee_manager") and event.e2ee_manager:
@@ -254,48 +385,34 @@ class DialoguePollHandler:
                     except Exception as e:
                         logger.debug(f"检查房间加密状态失败：{e}")
 
-                try:
-                    await _send_poll(
-                        event.client,
-                        room_id,
-                        question,
-                        options,
-                        reply_to=None,
-                        thread_root=None,
-                        use_thread=False,
-                        is_encrypted_room=is_encrypted_room,
-                        e2ee_manager=getattr(event, "e2ee_manager", None),
-                        max_selections=1,
-                        kind="m.disclosed",
-                        event_type=POLL_EVENT_TYPE_UNSTABLE,
-                        poll_key=POLL_POLL_KEY_UNSTABLE,
-                    )
-                    logger.info("对话投票已通过 Matrix 客户端发送（MSC3381）")
-                    return True
-                except Exception as e:
-                    logger.warning(f"发送投票失败，尝试回退到稳定事件类型：{e}")
-
-                try:
-                    await _send_poll(
-                        event.client,
-                        room_id,
-                        question,
-                        options,
-                        reply_to=None,
-                        thread_root=None,
-                        use_thread=False,
-                        is_encrypted_room=is_encrypted_room,
-                        e2ee_manager=getattr(event, "e2ee_manager", None),
-                        max_selections=1,
-                        kind="m.disclosed",
-                        event_type=POLL_EVENT_TYPE_STABLE,
-                        poll_key=POLL_POLL_KEY_STABLE,
-                    )
-                    logger.info("对话投票已通过 Matrix 客户端发送（稳定事件类型）")
-                    return True
-                except Exception as e:
-                    logger.error(f"发送投票失败（稳定事件类型仍失败）：{e}")
-                    return False
+                last_error = None
+                for event_type, poll_key, label in self._ordered_poll_types(
+                    cache_key
+                ):
+                    try:
+                        await _send_poll(
+                            event.client,
+                            room_id,
+                            question,
+                            options,
+                            reply_to=None,
+                            thread_root=None,
+                            use_thread=False,
+                            is_encrypted_room=is_encrypted_room,
+                            e2ee_manager=getattr(event, "e2ee_manager", None),
+                            max_selections=1,
+                            kind="m.disclosed",
+                            event_type=event_type,
+                            poll_key=poll_key,
+                        )
+                        self._preferred_poll_type[cache_key] = event_type
+                        logger.info(f"对话投票已通过 Matrix 客户端发送（{label}）")
+                        return True
+                    except Exception as e:
+                        last_error = e
+                        logger.warning(f"发送投票失败（{label}），尝试其他事件类型：{e}")
+                logger.error(f"发送投票失败（所有事件类型均失败）：{last_error}")
+                return False
             except Exception as e:
                 logger.debug(f"Matrix 客户端投票发送路径不可用：{e}")
 
@@ -311,31 +428,22 @@ class DialoguePollHandler:
         if not sender or not hasattr(sender, "send_poll"):
             return None
 
-        try:
-            await sender.send_poll(
-                room_id,
-                question=question,
-                answers=options,
-                max_selections=1,
-                event_type=POLL_EVENT_TYPE_UNSTABLE,
-                poll_key=POLL_POLL_KEY_UNSTABLE,
-            )
-            logger.info("对话投票已通过 Matrix 适配器发送（MSC3381）")
-            return True
-        except Exception as e:
-            logger.warning(f"发送投票失败，尝试回退到稳定事件类型：{e}")
-
-        try:
-            await sender.send_poll(
-                room_id,
-                question=question,
-                answers=options,
-                max_selections=1,
-                event_type=POLL_EVENT_TYPE_STABLE,
-                poll_key=POLL_POLL_KEY_STABLE,
-            )
-            logger.info("对话投票已通过 Matrix 适配器发送（稳定事件类型）")
-            return True
-        except Exception as e:
-            logger.error(f"发送投票失败（回退事件类型仍失败）：{e}")
-            return False
+        last_error = None
+        for event_type, poll_key, label in self._ordered_poll_types(cache_key):
+            try:
+                await sender.send_poll(
+                    room_id,
+                    question=question,
+                    answers=options,
+                    max_selections=1,
+                    event_type=event_type,
+                    poll_key=poll_key,
+                )
+                self._preferred_poll_type[cache_key] = event_type
+                logger.info(f"对话投票已通过 Matrix 适配器发送（{label}）")
+                return True
+            except Exception as e:
+                last_error = e
+                logger.warning(f"发送投票失败（{label}），尝试其他事件类型：{e}")
+        logger.error(f"发送投票失败（所有事件类型均失败）：{last_error}")
+        return False
@@ -6,6 +6,9 @@ from datetime import datetime
 
 from astrbot.api import logger
 
+# 送入 LLM 的消息样本条数
+_PROMPT_SAMPLE_SIZE = 50
+
 
 class PersonalReportHandler:
     """个人报告命令处理器"""
@@ -33,24 +36,27 @@ class PersonalReportHandler:
             max_tokens = self.config_manager.get_personal_report_max_tokens()
             custom_prompt = self.config_manager.get_personal_report_prompt()
 
-            # 提取用户消息内容用于 LLM 分析
+            # 提取用户消息内容用于 LLM 分析（prompt 只使用前 50 条，凑够即停止）
             message_texts = []
             for msg in messages[:max_messages]:
+                if len(message_texts) >= _PROMPT_SAMPLE_SIZE:
+                    break
                 if not isinstance(msg, dict):
                     continue
-                message_items = msg.get("message", [])
+                message_items = msg.get("message")
                 if not isinstance(message_items, list):
                     continue
-                for content in message_items:
-                    if not isinstance(content, dict):
-                        continue
-                    if content.get("type") == "text":
-                        data = content.get("data", {})
-                        if not isinstance(data, dict):
-                            data = {}
-                        text = str(data.get("text", "") or "").strip()
-                        if text:
-                            message_texts.append(text)
+                message_texts.extend(
+                    [
+                        text
+                        for content in message_items
+                        if isinstance(content, dict)
+                        and content.get("type") == "text"
+                        and isinstance(data := content.get("data"), dict)
+                        and (text := str(data.get("text") or "").strip())
+                    ]
+                )
+            sample_text = "\n".join(message_texts[:_PROMPT_SAMPLE_SIZE])
 
             if not message_texts:
                 return self.format_personal_basic_report(stats, user_id)
@@ -58,15 +64,13 @@ class PersonalReportHandler:
             # 构建 prompt
             if custom_prompt:
                 # 使用自定义 prompt，支持 {messages} 占位符
-                prompt = custom_prompt.replace(
-                    "{messages}", chr(10).join(message_texts[:50])
-                )
+                prompt = custom_prompt.replace("{messages}", sample_text)
             else:
                 # 使用默认 prompt
                 prompt = f"""分析以下用户在群聊中的发言，生成一份简短的个人画像报告。
 
 用户消息样本：
-{chr(10).join(message_texts[:50])}
+{sample_text}
 
 请分析：
 1. 用户的说话风格和特点（2-3 句话）
@@ -4,11 +4,15 @@
 
 import asyncio
 import os
+import time
 
 from astrbot.api import logger
 
 from ..utils.pdf_utils import PDFInstaller
 
+# 模板目录仅在插件更新时变化，扫描结果缓存一段时间即可
+_TEMPLATES_TTL = 60.0
+
 
 class SettingsHandler:
     """设置命令处理器"""
@@ -16,6 +20,8 @@ class SettingsHandler:
     def __init__(self, config_manager, plugin_dir: str):
         self.config_manager = config_manager
         self.plugin_dir = plugin_dir
+        self._templates_cache: tuple[float, list[str]] | None = None
+        self._preview_path_cache: dict[str, str | None] = {}
 
     def get_output_format_info(self) -> str:
         """获取输出格式信息"""
@@ -46,25 +52,30 @@ class SettingsHandler:
         self.config_manager.set_output_format(format_type)
         return True, f"✅ 输出格式已设置为：{format_type}"
 
-    async def list_templates(self) -> list[str]:
-        """获取可用模板列表"""
+    def _scan_templates(self) -> list[str]:
+        """扫描模板目录（同步）"""
         template_base_dir = os.path.join(
             self.plugin_dir, "src", "reports", "templates"
         )
-
-        def _list_templates_sync():
-            if os.path.exists(template_base_dir):
+        try:
+            with os.scandir(template_base_dir) as entries:
                 return sorted(
-                    [
-                        d
-                        for d in os.listdir(template_base_dir)
-                        if os.path.isdir(os.path.join(template_base_dir, d))
-                        and not d.startswith("__")
-                    ]
+                    entry.name
+                    for entry in entries
+                    if not entry.name.startswith("__") and entry.is_dir()
                 )
+        except FileNotFoundError:
             return []
 
-        return await asyncio.to_thread(_list_templates_sync)
+    async def list_templates(self) -> list[str]:
+        """获取可用模板列表"""
+        cached = self._templates_cache
+        if cached and time.monotonic() - cached[0] < _TEMPLATES_TTL:
+            return list(cached[1])
+
+        templates = await asyncio.to_thread(self._scan_templates)
+        self._templates_cache = (time.monotonic(), templates)
+        return list(templates)
 
     def get_template_info(self, available_templates: list[str]) -> str:
         """获取模板信息"""
@@ -108,11 +119,14 @@ class SettingsHandler:
 
     def get_template_preview_path(self, template_name: str) -> str | None:
         """获取模板预览图路径"""
+        # assets 目录运行期间不变，按模板名缓存检测结果
+        if template_name in self._preview_path_cache:
+            return self._preview_path_cache[template_name]
         assets_dir = os.path.join(self.plugin_dir, "assets")
         preview_image_path = os.path.join(assets_dir, f"{template_name}-demo.jpg")
-        if os.path.exists(preview_image_path):
-            return preview_image_path
-        return None
+        result = preview_image_path if os.path.exists(preview_image_path) else None
+        self._preview_path_cache[template_name] = result
+        return result
 
     async def install_pdf_deps(self) -> str:
         """安装 PDF 依赖"""
@@ -153,21 +167,13 @@ class SettingsHandler:
         """启用群组"""
         mode = self.config_manager.get_group_list_mode()
         if mode == "whitelist":
-            glist = self.config_manager.get_group_list()
-            if group_id not in glist:
-                glist.append(group_id)
-                self.config_manager.set_group_list(glist)
+            if self.config_manager.add_to_group_list(group_id):
                 return "✅ 已将当前群加入白名单"
-            else:
-                return "ℹ️ 当前群已在白名单中"
+            return "ℹ️ 当前群已在白名单中"
         elif mode == "blacklist":
-            glist = self.config_manager.get_group_list()
-            if group_id in glist:
-                glist.remove(group_id)
-                self.config_manager.set_group_list(glist)
+            if self.config_manager.remove_from_group_list(group_id):
                 return "✅ 已将当前群从黑名单移除"
-            else:
-                return "ℹ️ 当前群不在黑名单中"
+            return "ℹ️ 当前群不在黑名单中"
         else:
             return "ℹ️ 当前为无限制模式，所有群聊默认启用"
 
@@ -175,20 +181,12 @@ class SettingsHandler:
         """禁用群组"""
         mode = self.config_manager.get_group_list_mode()
         if mode == "whitelist":
-            glist = self.config_manager.get_group_list()
-            if group_id in glist:
-                glist.remove(group_id)
-                self.config_manager.set_group_list(glist)
+            if self.config_manager.remove_from_group_list(group_id):
                 return "✅ 已将当前群从白名单移除"
-            else:
-                return "ℹ️ 当前群不在白名单中"
+            return "ℹ️ 当前群不在白名单中"
         elif mode == "blacklist":
-            glist = self.config_manager.get_group_list()
-            if group_id not in glist:
-                glist.append(group_id)
-                self.config_manager.set_group_list(glist)
+            if self.config_manager.add_to_group_list(group_id):
                 return "✅ 已将当前群加入黑名单"
-            else:
-                return "ℹ️ 当前群已在黑名单中"
+            return "ℹ️ 当前群已在黑名单中"
         else:
             return "ℹ️ 当前为无限制模式，如需禁用请切换到黑名单模式"
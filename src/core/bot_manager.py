@@ -3,6 +3,7 @@ Bot 实例管理模块
 统一管理 bot 实例的获取、设置和使用
 """
 
+import sys
 from typing import Any
 
 from astrbot.api import logger
@@ -15,7 +16,10 @@ class BotManager:
         self.config_manager = config_manager
         self._bot_instances = {}  # 改为字典：{platform_id: bot_instance}
         self._platforms = {}  # 存储平台对象以访问配置
+        # (platform_id, plugin_name) -> 是否启用，平台对象变化时清空
+        self._plugin_enabled_cache: dict[tuple[str, str], bool] = {}
         self._bot_matrix_ids = []  # 支持多个 matrix 号
+        self._bot_matrix_ids_set = frozenset()  # 用于消息过滤的 O(1) 查找
         self._context = None
         self._is_initialized = False
         self._default_platform = "default"  # 默认平台
@@ -25,9 +29,9 @@ class BotManager:
         self._context = context
 
     def _iter_platform_instances(self) -> list:
-        if not self._context or not hasattr(self._context, "platform_manager"):
+        platform_manager = getattr(self._context, "platform_manager", None)
+        if platform_manager is None:
             return []
-        platform_manager = self._context.platform_manager
         get_insts = getattr(platform_manager, "get_insts", None)
         if callable(get_insts):
             try:
@@ -66,28 +70,39 @@ class BotManager:
             platform_id = self._get_platform_id_from_instance(bot_instance)
 
         if bot_instance and platform_id:
-            self._bot_instances[platform_id] = bot_instance
+            self._bot_instances[sys.intern(str(platform_id))] = bot_instance
             # 自动提取 matrix 号
             bot_matrix_id = self._extract_bot_matrix_id(bot_instance)
-            if bot_matrix_id and bot_matrix_id not in self._bot_matrix_ids:
-                self._bot_matrix_ids.append(str(bot_matrix_id))
+            if bot_matrix_id and bot_matrix_id not in self._bot_matrix_ids_set:
+                self._bot_matrix_ids.append(sys.intern(bot_matrix_id))
+                self._bot_matrix_ids_set = frozenset(self._bot_matrix_ids)
 
     def set_bot_matrix_ids(self, bot_matrix_ids):
-        """设置 bot matrix 号（支持单个 matrix 号或 matrix 号列表）"""
-        if isinstance(bot_matrix_ids, list):
-            self._bot_matrix_ids = [str(matrix) for matrix in bot_matrix_ids if matrix]
-            if self._bot_matrix_ids:
-                self._bot_matrix_id = self._bot_matrix_ids[0]  # 保持向后兼容
-        elif bot_matrix_ids:
-            self._bot_matrix_id = str(bot_matrix_ids)
-            self._bot_matrix_ids = [str(bot_matrix_ids)]
+        """设置 bot matrix 号（支持单个 matrix 号或任意可迭代的 matrix 号集合）"""
+        if isinstance(bot_matrix_ids, str):
+            values = (bot_matrix_ids,)
+        else:
+            try:
+                values = iter(bot_matrix_ids)
+            except TypeError:
+                values = (bot_matrix_ids,)
+        if isinstance(values, tuple) and not bot_matrix_ids:
+            # 单个空值视为未提供，保持现有设置
+            return
+        self._bot_matrix_ids = [
+            sys.intern(str(matrix)) for matrix in values if matrix
+        ]
+        if self._bot_matrix_ids:
+            self._bot_matrix_id = self._bot_matrix_ids[0]  # 保持向后兼容
+        self._bot_matrix_ids_set = frozenset(self._bot_matrix_ids)
 
     def _add_bot_matrix_id(self, bot_matrix_id: str | None) -> None:
         if not bot_matrix_id:
             return
-        normalized = str(bot_matrix_id)
-        if normalized not in self._bot_matrix_ids:
+        normalized = sys.intern(str(bot_matrix_id))
+        if normalized not in self._bot_matrix_ids_set:
             self._bot_matrix_ids.append(normalized)
+            self._bot_matrix_ids_set = frozenset(self._bot_matrix_ids)
         if self._bot_matrix_ids:
             self._bot_matrix_id = self._bot_matrix_ids[0]
 
@@ -101,11 +116,11 @@ class BotManager:
         if self._bot_instances:
             # 如果只有一个实例，直接返回
             if len(self._bot_instances) == 1:
-                return list(self._bot_instances.values())[0]
+                return next(iter(self._bot_instances.values()))
 
             # 如果有多个实例，必须指定 platform_id
             logger.error(
-                f"存在多个 Bot 实例 {list(self._bot_instances.keys())} 但未指定 platform_id，"
+                f"存在多个 Bot 实例 {tuple(self._bot_instances)} 但未指定 platform_id，"
                 "无法确定使用哪个实例。请明确指定 platform_id。"
             )
             return None
@@ -122,14 +137,20 @@ class BotManager:
         """检查是否有配置的 bot matrix 号"""
         return bool(self._bot_matrix_ids)
 
+    @property
+    def bot_matrix_id_set(self) -> frozenset[str]:
+        """当前 bot matrix 号集合（不可变，修改时整体替换，可安全地在循环外取出）"""
+        return self._bot_matrix_ids_set
+
     def is_ready_for_auto_analysis(self) -> bool:
         """检查是否准备好进行自动分析"""
         return self.has_bot_instance() and self.has_bot_matrix_id()
 
     def _get_platform_id_from_instance(self, bot_instance):
         """从 bot 实例获取平台 ID"""
-        if hasattr(bot_instance, "platform") and isinstance(bot_instance.platform, str):
-            return bot_instance.platform
+        platform = getattr(bot_instance, "platform", None)
+        if isinstance(platform, str):
+            return platform
         return self._default_platform
 
     async def auto_discover_bot_instances(self):
@@ -142,17 +163,17 @@ class BotManager:
 
         for platform in platforms:
             # 获取 bot 实例
-            bot_client = None
-            if hasattr(platform, "get_client"):
-                bot_client = platform.get_client()
-            elif hasattr(platform, "bot"):
-                bot_client = platform.bot
+            get_client = getattr(platform, "get_client", None)
+            if get_client is not None:
+                bot_client = get_client()
+            else:
+                bot_client = getattr(platform, "bot", None)
 
             if not bot_client:
                 continue
 
             platform_name, platform_id = self._extract_platform_meta(platform)
-            normalized_platform_id = str(platform_id or "matrix")
+            normalized_platform_id = sys.intern(str(platform_id or "matrix"))
             normalized_platform_name = str(platform_name or "").strip().lower()
             # matrix_daily_analysis 仅支持 Matrix
             if normalized_platform_name and normalized_platform_name != "matrix":
@@ -168,6 +189,7 @@ class BotManager:
         if discovered:
             self._bot_instances = discovered
             self._platforms = discovered_platforms
+            self._plugin_enabled_cache.clear()
 
         return discovered
 
@@ -204,15 +226,17 @@ class BotManager:
         candidates: list[str] = []
 
         try:
-            if hasattr(event, "get_platform_id"):
-                candidate = str(event.get_platform_id() or "").strip()
+            get_platform_id = getattr(event, "get_platform_id", None)
+            if get_platform_id is not None:
+                candidate = str(get_platform_id() or "").strip()
                 if candidate:
                     candidates.append(candidate)
         except Exception:
             pass
 
-        if hasattr(event, "platform") and isinstance(event.platform, str):
-            candidate = str(event.platform or "").strip()
+        event_platform = getattr(event, "platform", None)
+        if isinstance(event_platform, str):
+            candidate = event_platform.strip()
             if candidate and candidate not in candidates:
                 candidates.append(candidate)
 
@@ -227,8 +251,9 @@ class BotManager:
 
         platform_name = ""
         try:
-            if hasattr(event, "get_platform_name"):
-                platform_name = str(event.get_platform_name() or "").strip().lower()
+            get_platform_name = getattr(event, "get_platform_name", None)
+            if get_platform_name is not None:
+                platform_name = str(get_platform_name() or "").strip().lower()
         except Exception:
             platform_name = ""
 
@@ -246,40 +271,29 @@ class BotManager:
         if not platform_id:
             return False
 
-        if hasattr(event, "bot") and event.bot:
-            self.set_bot_instance(event.bot, platform_id)
-            # 每次都尝试从 bot 实例提取用户 ID
-            bot_id = self._extract_bot_matrix_id(event.bot)
-            if bot_id:
-                self._add_bot_matrix_id(bot_id)
-            else:
-                # 如果 bot 实例没有 ID，尝试使用配置的 ID 列表
-                config_ids = self.config_manager.get_bot_matrix_ids()
-                if config_ids:
-                    self.set_bot_matrix_ids(config_ids)
-            return True
-
-        if hasattr(event, "client") and event.client:
-            self.set_bot_instance(event.client, platform_id)
-            bot_id = self._extract_bot_matrix_id(event.client)
-            if bot_id:
-                self._add_bot_matrix_id(bot_id)
-            else:
-                config_ids = self.config_manager.get_bot_matrix_ids()
-                if config_ids:
-                    self.set_bot_matrix_ids(config_ids)
-            return True
+        bot = getattr(event, "bot", None) or getattr(event, "client", None)
+        if not bot:
+            return False
 
-        return False
+        self.set_bot_instance(bot, platform_id)
+        # 每次都尝试从 bot 实例提取用户 ID
+        bot_id = self._extract_bot_matrix_id(bot)
+        if bot_id:
+            self._add_bot_matrix_id(bot_id)
+        else:
+            # 如果 bot 实例没有 ID，尝试使用配置的 ID 列表
+            config_ids = self.config_manager.get_bot_matrix_ids()
+            if config_ids:
+                self.set_bot_matrix_ids(config_ids)
+        return True
 
     def _extract_bot_matrix_id(self, bot_instance):
         """从 bot 实例中提取用户 ID"""
-        if hasattr(bot_instance, "user_id") and bot_instance.user_id:
-            return str(bot_instance.user_id)
-        # Fallback for some adapters that might use self_id
-        if hasattr(bot_instance, "self_id") and bot_instance.self_id:
-            return str(bot_instance.self_id)
-        return None
+        # 部分适配器使用 self_id 作为回退
+        uid = getattr(bot_instance, "user_id", None) or getattr(
+            bot_instance, "self_id", None
+        )
+        return str(uid) if uid else None
 
     def validate_for_message_fetching(self, group_id: str) -> bool:
         """验证是否可以进行消息获取"""
@@ -287,12 +301,9 @@ class BotManager:
 
     def should_filter_bot_message(self, sender_id: str) -> bool:
         """判断是否应该过滤 bot 自己的消息（支持多个 matrix 号）"""
-        if not self._bot_matrix_ids:
-            return False
-
-        sender_id_str = str(sender_id)
-        # 检查是否在 matrix 号列表中
-        return sender_id_str in self._bot_matrix_ids
+        if type(sender_id) is not str:
+            sender_id = str(sender_id)
+        return sender_id in self._bot_matrix_ids_set
 
     def get_platform(
         self, platform_id: str | None = None, platform_name: str | None = None
@@ -308,6 +319,7 @@ class BotManager:
                 normalized_meta_name = str(meta_name or "").strip().lower()
                 if platform_id and meta_id == platform_id:
                     self._platforms[platform_id] = platform
+                    self._plugin_enabled_cache.clear()
                     return platform
                 if (
                     not platform_id
@@ -316,6 +328,7 @@ class BotManager:
                 ):
                     key = meta_id or normalized_target_platform_name
                     self._platforms[key] = platform
+                    self._plugin_enabled_cache.clear()
                     return platform
             except Exception:
                 continue
@@ -340,16 +353,25 @@ class BotManager:
 
     def is_plugin_enabled(self, platform_id: str, plugin_name: str) -> bool:
         """检查指定平台是否启用了该插件"""
+        cache_key = (platform_id, plugin_name)
+        cached = self._plugin_enabled_cache.get(cache_key)
+        if cached is None:
+            cached = self._plugin_enabled_cache[cache_key] = (
+                self._check_plugin_enabled(platform_id, plugin_name)
+            )
+        return cached
+
+    def _check_plugin_enabled(self, platform_id: str, plugin_name: str) -> bool:
         if platform_id not in self._platforms:
             # 如果找不到平台对象（例如是手动添加的），默认认为启用
             # 或者可以返回 True，因为无法进行否定检查
             return True
 
-        platform = self._platforms[platform_id]
-        if not hasattr(platform, "config") or not isinstance(platform.config, dict):
+        platform_config = getattr(self._platforms[platform_id], "config", None)
+        if not isinstance(platform_config, dict):
             return True
 
-        plugin_set = platform.config.get("plugin_set", ["*"])
+        plugin_set = platform_config.get("plugin_set", ["*"])
         if plugin_set is None:
             return False  # 如果明确为 None, 视为都不启用？或者默认？Default is ["*"] usually.
         if isinstance(plugin_set, str):
@@ -4,16 +4,34 @@
 """
 
 import sys
+from collections.abc import Iterable
 from datetime import datetime
+from functools import lru_cache
 
 from astrbot.api import AstrBotConfig, logger
 from astrbot.core.utils.astrbot_path import get_astrbot_data_path
 
 MAX_ANALYSIS_DAYS = 31
 
+# 默认自动分析时间与 PDF 文件名格式
+DEFAULT_AUTO_ANALYSIS_TIME = "09:00"
+DEFAULT_PDF_FILENAME_FORMAT = "群聊分析报告_{group_id}_{date}.pdf"
 
+# 配置读取缓存未命中标记
+_CACHE_MISS = object()
+
+# _normalize_bool 识别的真/假字符串
+_TRUE_STRINGS = frozenset({"1", "true", "yes", "on", "enable", "enabled"})
+_FALSE_STRINGS = frozenset({"0", "false", "no", "off", "disable", "disabled"})
+
+# 枚举型配置项的合法取值
+_GROUP_LIST_MODES = frozenset({"whitelist", "blacklist", "none"})
+_OUTPUT_FORMATS = frozenset({"image", "text", "pdf"})
+
+
+@lru_cache(maxsize=1)
 def get_default_reports_dir():
-    """获取插件报告目录（Path）"""
+    """获取插件报告目录（Path），进程内不变，缓存首次结果"""
     try:
         plugin_name = "astrbot_plugin_matrix_daily_analysis"
         data_path = get_astrbot_data_path()
@@ -24,34 +42,105 @@ def get_default_reports_dir():
         return Path("data/plugins/astrbot_plugin_matrix_daily_analysis/reports")
 
 
+@lru_cache(maxsize=256)
+def _parse_hhmm(raw: str) -> str | None:
+    """解析 HH:MM 时间并规范化，无效时返回 None（合法取值有限，结果缓存）"""
+    try:
+        parsed = datetime.strptime(raw, "%H:%M")
+    except ValueError:
+        return None
+    return parsed.strftime("%H:%M")
+
+
+def _int_getter(
+    path: tuple[str, ...],
+    legacy_key: str,
+    default: int,
+    *,
+    minimum: int | None = None,
+    maximum: int | None = None,
+    doc: str = "",
+):
+    """按声明生成整数配置 getter（读取与规范化逻辑统一），名称为 get_<legacy_key>"""
+
+    def getter(self) -> int:
+        value = self._get_nested(path, default, legacy_key)
+        return self._normalize_int(value, default, minimum=minimum, maximum=maximum)
+
+    getter.__name__ = f"get_{legacy_key}"
+    getter.__doc__ = doc
+    return getter
+
+
 class ConfigManager:
-    """配置管理器"""
+    """配置管理器
+
+    配置读取结果会被缓存：通过本类的 set_* 方法写入时自动失效；
+    在外部直接修改 AstrBot 配置后，需调用 reload_config()（/分析设置 reload）才会生效。
+    """
+
+    __slots__ = (
+        "config",
+        "_sentinel",
+        "_cache",
+        "_derived",
+        "_reports_dir",
+        "_playwright_available",
+        "_playwright_version",
+        "_playwright_checked",
+        "_playwright_modules",
+    )
+
+    # playwright 探测结果 (可用性, 版本)，多个实例共享，避免重复导入探测
+    _playwright_probe: tuple[bool, str | None] | None = None
 
     def __init__(self, config: AstrBotConfig):
         self.config = config
+        self._sentinel = object()
+        # _get_nested 结果缓存：legacy_key 或 path -> 值（缺失时为 _sentinel）
+        self._cache: dict[str | tuple, object] = {}
+        # 基于 _cache 规范化后的结果缓存（如群组访问集合），与 _cache 一同失效
+        self._derived: dict[str | tuple, object] = {}
+        self._reports_dir = None
         self._playwright_available = False
         self._playwright_version = None
-        self._check_playwright_availability()
-        self._sentinel = object()
+        # playwright 导入开销较大，首次访问可用性时再检查
+        self._playwright_checked = False
+        # 首次成功导入后记录的 playwright 模块名，重载时免去扫描整个 sys.modules
+        self._playwright_modules: tuple[str, ...] = ()
 
     def _get_nested(
         self, path: tuple[str, ...], default=None, legacy_key: str | None = None
     ):
+        # 每个配置路径对应唯一的旧版键名，优先用其字符串（哈希已缓存）作为键，
+        # 避免每次调用构造 (path, legacy_key) 元组
+        cache_key = legacy_key or path
+        value = self._cache.get(cache_key, _CACHE_MISS)
+        if value is _CACHE_MISS:
+            value = self._lookup_nested(path, legacy_key)
+            self._cache[cache_key] = value
+        return default if value is self._sentinel else value
+
+    def _lookup_nested(self, path: tuple[str, ...], legacy_key: str | None):
+        """实际遍历配置，未找到时返回 _sentinel"""
         if legacy_key is not None:
             legacy_value = self.config.get(legacy_key, self._sentinel)
             if legacy_value is not self._sentinel:
                 return legacy_value
 
-        current = self.config.get(path[0], self._sentinel)
-        if current is self._sentinel:
-            return default
-        for key in path[1:]:
-            if not isinstance(current, dict):
-                return default
-            current = current.get(key, self._sentinel)
-            if current is self._sentinel:
-                return default
-        return current
+        # 配置结构正常时直接下标访问；缺键或中间节点不是字典时按未找到处理
+        try:
+            current = self.config
+            for key in path:
+                current = current[key]
+            return current
+        except (KeyError, TypeError):
+            return self._sentinel
+
+    def _invalidate_cache(self):
+        """清除配置读取缓存（唯一的失效入口）"""
+        self._cache.clear()
+        self._derived.clear()
 
     def _set_nested(self, path: tuple[str, ...], value):
         root_key = path[0]
@@ -62,11 +151,20 @@ class ConfigManager:
         for key in path[1:-1]:
             child = current.get(key)
             if not isinstance(child, dict):
-                child = {}
-            current[key] = child
+                child = current[key] = {}
             current = child
-        current[path[-1]] = value
+        leaf = path[-1]
+        if (
+            self.config.get(root_key) is root
+            and leaf in current
+            and type(current[leaf]) is type(value)
+            and current[leaf] == value
+        ):
+            # 值未变化，无需失效缓存或写盘
+            return
+        current[leaf] = value
         self.config[root_key] = root
+        self._invalidate_cache()
         self.config.save_config()
 
     @staticmethod
@@ -76,12 +174,30 @@ class ConfigManager:
         if value is None:
             return default
         raw = str(value).strip().lower()
-        if raw in {"1", "true", "yes", "on", "enable", "enabled"}:
+        if raw in _TRUE_STRINGS:
             return True
-        if raw in {"0", "false", "no", "off", "disable", "disabled"}:
+        if raw in _FALSE_STRINGS:
             return False
         return default
 
+    @staticmethod
+    def _normalize_str_list(items) -> list[str]:
+        """将各项转为字符串并去掉空白项（每项只转换一次）"""
+        return [s for item in items if (s := str(item or "")).strip()]
+
+    def _get_str_tuple(self, path: tuple[str, ...], legacy_key: str) -> tuple[str, ...]:
+        """读取字符串列表配置，规范化为元组后缓存（各调用方共享同一元组）"""
+        value = self._derived.get(legacy_key)
+        if value is None:
+            raw_list = self._get_nested(path, None, legacy_key)
+            value = (
+                tuple(self._normalize_str_list(raw_list))
+                if isinstance(raw_list, list)
+                else ()
+            )
+            self._derived[legacy_key] = value
+        return value
+
     @staticmethod
     def _normalize_int(
         value: object,
@@ -90,14 +206,18 @@ class ConfigManager:
         minimum: int | None = None,
         maximum: int | None = None,
     ) -> int:
-        try:
-            normalized = int(value)
-        except (TypeError, ValueError):
-            normalized = default
-        if minimum is not None:
-            normalized = max(minimum, normalized)
-        if maximum is not None:
-            normalized = min(maximum, normalized)
+        if type(value) is int:
+            # 配置来自 JSON，绝大多数情况下已是 int
+            normalized = value
+        else:
+            try:
+                normalized = int(value)
+            except (TypeError, ValueError):
+                normalized = default
+        if minimum is not None and normalized < minimum:
+            normalized = minimum
+        if maximum is not None and normalized > maximum:
+            normalized = maximum
         return normalized
 
     def get_group_list_mode(self) -> str:
@@ -110,80 +230,90 @@ class ConfigManager:
             .strip()
             .lower()
         )
-        if raw_mode in {"whitelist", "blacklist", "none"}:
+        if raw_mode in _GROUP_LIST_MODES:
             return raw_mode
         return "none"
 
-    def get_group_list(self) -> list[str]:
+    def get_group_list(self) -> tuple[str, ...]:
         """获取群组列表（用于黑白名单）"""
-        raw_list = self._get_nested(("group_access", "list"), [], "group_list")
-        if not isinstance(raw_list, list):
-            return []
-        return [str(item) for item in raw_list if str(item or "").strip()]
+        return self._get_str_tuple(("group_access", "list"), "group_list")
+
+    def _get_group_access(self) -> tuple[str, frozenset[str]]:
+        """获取缓存的 (模式, 群组集合)，配置修改或重载后重新解析"""
+        access = self._derived.get("group_access")
+        if access is None:
+            access = self._derived["group_access"] = (
+                self.get_group_list_mode(),
+                frozenset(self.get_group_list()),
+            )
+        return access
+
+    def add_to_group_list(self, group_id: str) -> bool:
+        """将群组加入列表，返回是否发生变更"""
+        group_id = str(group_id)
+        if group_id in self._get_group_access()[1]:
+            return False
+        self.set_group_list([*self.get_group_list(), group_id])
+        return True
+
+    def remove_from_group_list(self, group_id: str) -> bool:
+        """将群组从列表移除，返回是否发生变更"""
+        group_id = str(group_id)
+        if group_id not in self._get_group_access()[1]:
+            return False
+        self.set_group_list([g for g in self.get_group_list() if g != group_id])
+        return True
 
     def is_group_allowed(self, group_id: str) -> bool:
         """根据配置的白/黑名单判断是否允许在该群聊中使用"""
-        mode = self.get_group_list_mode().lower()
-        if mode not in ("whitelist", "blacklist", "none"):
-            mode = "none"
+        mode, groups = self._get_group_access()
 
         # none 模式下，不进行黑白名单检查，由调用方决定（通常是回退到 enabled_groups）
         if mode == "none":
             return True
-
-        glist = [str(g) for g in self.get_group_list()]
-        group_id_str = str(group_id)
-
-        if mode == "whitelist":
-            return group_id_str in glist if glist else False
-        if mode == "blacklist":
-            return group_id_str not in glist if glist else True
-
-        return True
-
-    def get_max_concurrent_tasks(self) -> int:
-        """获取自动分析最大并发数"""
-        value = self._get_nested(
-            ("analysis", "max_concurrent_tasks"), 5, "max_concurrent_tasks"
-        )
-        return self._normalize_int(value, 5, minimum=1)
-
-    def get_max_messages(self) -> int:
-        """获取最大消息数量"""
-        value = self._get_nested(("analysis", "max_messages"), 1000, "max_messages")
-        return self._normalize_int(value, 1000, minimum=1)
-
-    def get_analysis_days(self) -> int:
-        """获取分析天数"""
-        days = self._get_nested(("analysis", "days"), 1, "analysis_days")
-        return self._normalize_int(
-            days,
-            1,
-            minimum=1,
-            maximum=MAX_ANALYSIS_DAYS,
-        )
-
-    def get_history_filter_prefixes(self) -> list[str]:
+        if not groups or not group_id:
+            # 列表不含空 ID：空 ID 或空列表时，白名单拒绝、黑名单放行
+            return mode == "blacklist"
+        if type(group_id) is not str:
+            group_id = str(group_id)
+        return (group_id in groups) == (mode == "whitelist")
+
+    get_max_concurrent_tasks = _int_getter(
+        ("analysis", "max_concurrent_tasks"),
+        "max_concurrent_tasks",
+        5,
+        minimum=1,
+        doc="获取自动分析最大并发数",
+    )
+
+    get_max_messages = _int_getter(
+        ("analysis", "max_messages"),
+        "max_messages",
+        1000,
+        minimum=1,
+        doc="获取最大消息数量",
+    )
+
+    get_analysis_days = _int_getter(
+        ("analysis", "days"),
+        "analysis_days",
+        1,
+        minimum=1,
+        maximum=MAX_ANALYSIS_DAYS,
+        doc="获取分析天数",
+    )
+
+    def get_history_filter_prefixes(self) -> tuple[str, ...]:
         """获取历史消息过滤前缀（全局）"""
-        raw_value = self._get_nested(
-            ("analysis", "history_filters", "prefixes"),
-            [],
-            "history_filter_prefixes",
+        return self._get_str_tuple(
+            ("analysis", "history_filters", "prefixes"), "history_filter_prefixes"
         )
-        if not isinstance(raw_value, list):
-            return []
-        return [str(item) for item in raw_value if str(item or "").strip()]
 
-    def get_history_filter_users(self) -> list[str]:
+    def get_history_filter_users(self) -> tuple[str, ...]:
         """获取历史消息过滤用户（全局）"""
-        raw_value = self._get_nested(
-            ("analysis", "history_filters", "users"),
-            [],
-            "history_filter_users",
+        return self._get_str_tuple(
+            ("analysis", "history_filters", "users"), "history_filter_users"
         )
-        if not isinstance(raw_value, list):
-            return []
-        return [str(item) for item in raw_value if str(item or "").strip()]
 
     def should_skip_history_bots(self) -> bool:
         """判断是否全局跳过机器人发言"""
@@ -197,12 +327,14 @@ class ConfigManager:
     def get_auto_analysis_time(self) -> str:
         """获取自动分析时间"""
         auto_time = self._get_nested(
-            ("auto_analysis", "time"), "09:00", "auto_analysis_time"
+            ("auto_analysis", "time"),
+            DEFAULT_AUTO_ANALYSIS_TIME,
+            "auto_analysis_time",
         )
         normalized = self._normalize_auto_analysis_time(auto_time)
         if normalized is None:
             logger.warning(f"自动分析时间配置无效：{auto_time!r}，已回退默认值 09:00")
-            return "09:00"
+            return DEFAULT_AUTO_ANALYSIS_TIME
         return normalized
 
     def get_enable_auto_analysis(self) -> bool:
@@ -222,16 +354,17 @@ class ConfigManager:
             .strip()
             .lower()
         )
-        if raw_format in {"image", "text", "pdf"}:
+        if raw_format in _OUTPUT_FORMATS:
             return raw_format
         return "image"
 
-    def get_min_messages_threshold(self) -> int:
-        """获取最小消息阈值"""
-        value = self._get_nested(
-            ("analysis", "min_messages_threshold"), 50, "min_messages_threshold"
-        )
-        return self._normalize_int(value, 50, minimum=1)
+    get_min_messages_threshold = _int_getter(
+        ("analysis", "min_messages_threshold"),
+        "min_messages_threshold",
+        50,
+        minimum=1,
+        doc="获取最小消息阈值",
+    )
 
     def get_topic_analysis_enabled(self) -> bool:
         """获取是否启用话题分析"""
@@ -274,60 +407,77 @@ class ConfigManager:
         )
         return self._normalize_bool(value, True)
 
-    def get_max_topics(self) -> int:
-        """获取最大话题数量"""
-        value = self._get_nested(("analysis", "topic", "max_topics"), 5, "max_topics")
-        return self._normalize_int(value, 5, minimum=1)
-
-    def get_max_user_titles(self) -> int:
-        """获取最大用户称号数量"""
-        value = self._get_nested(
-            ("analysis", "user_title", "max_titles"), 8, "max_user_titles"
-        )
-        return self._normalize_int(value, 8, minimum=1)
-
-    def get_max_golden_quotes(self) -> int:
-        """获取最大金句数量"""
-        value = self._get_nested(
-            ("analysis", "golden_quote", "max_quotes"), 5, "max_golden_quotes"
-        )
-        return self._normalize_int(value, 5, minimum=1)
-
-    def get_llm_timeout(self) -> int:
-        """获取 LLM 请求超时时间（秒）"""
-        value = self._get_nested(("llm", "timeout"), 30, "llm_timeout")
-        return self._normalize_int(value, 30, minimum=1)
-
-    def get_llm_retries(self) -> int:
-        """获取 LLM 请求重试次数"""
-        value = self._get_nested(("llm", "retries"), 2, "llm_retries")
-        return self._normalize_int(value, 2, minimum=0)
-
-    def get_llm_backoff(self) -> int:
-        """获取 LLM 请求重试退避基值（秒），实际退避会乘以尝试次数"""
-        value = self._get_nested(("llm", "backoff"), 2, "llm_backoff")
-        return self._normalize_int(value, 2, minimum=0)
-
-    def get_topic_max_tokens(self) -> int:
-        """获取话题分析最大 token 数"""
-        value = self._get_nested(
-            ("analysis", "topic", "max_tokens"), 12288, "topic_max_tokens"
-        )
-        return self._normalize_int(value, 12288, minimum=1)
-
-    def get_golden_quote_max_tokens(self) -> int:
-        """获取金句分析最大 token 数"""
-        value = self._get_nested(
-            ("analysis", "golden_quote", "max_tokens"), 4096, "golden_quote_max_tokens"
-        )
-        return self._normalize_int(value, 4096, minimum=1)
-
-    def get_user_title_max_tokens(self) -> int:
-        """获取用户称号分析最大 token 数"""
-        value = self._get_nested(
-            ("analysis", "user_title", "max_tokens"), 4096, "user_title_max_tokens"
-        )
-        return self._normalize_int(value, 4096, minimum=1)
+    get_max_topics = _int_getter(
+        ("analysis", "topic", "max_topics"),
+        "max_topics",
+        5,
+        minimum=1,
+        doc="获取最大话题数量",
+    )
+
+    get_max_user_titles = _int_getter(
+        ("analysis", "user_title", "max_titles"),
+        "max_user_titles",
+        8,
+        minimum=1,
+        doc="获取最大用户称号数量",
+    )
+
+    get_max_golden_quotes = _int_getter(
+        ("analysis", "golden_quote", "max_quotes"),
+        "max_golden_quotes",
+        5,
+        minimum=1,
+        doc="获取最大金句数量",
+    )
+
+    get_llm_timeout = _int_getter(
+        ("llm", "timeout"),
+        "llm_timeout",
+        30,
+        minimum=1,
+        doc="获取 LLM 请求超时时间（秒）",
+    )
+
+    get_llm_retries = _int_getter(
+        ("llm", "retries"),
+        "llm_retries",
+        2,
+        minimum=0,
+        doc="获取 LLM 请求重试次数",
+    )
+
+    get_llm_backoff = _int_getter(
+        ("llm", "backoff"),
+        "llm_backoff",
+        2,
+        minimum=0,
+        doc="获取 LLM 请求重试退避基值（秒），实际退避会乘以尝试次数",
+    )
+
+    get_topic_max_tokens = _int_getter(
+        ("analysis", "topic", "max_tokens"),
+        "topic_max_tokens",
+        12288,
+        minimum=1,
+        doc="获取话题分析最大 token 数",
+    )
+
+    get_golden_quote_max_tokens = _int_getter(
+        ("analysis", "golden_quote", "max_tokens"),
+        "golden_quote_max_tokens",
+        4096,
+        minimum=1,
+        doc="获取金句分析最大 token 数",
+    )
+
+    get_user_title_max_tokens = _int_getter(
+        ("analysis", "user_title", "max_tokens"),
+        "user_title_max_tokens",
+        4096,
+        minimum=1,
+        doc="获取用户称号分析最大 token 数",
+    )
 
     def get_llm_provider_id(self) -> str:
         """获取主 LLM Provider ID"""
@@ -365,32 +515,40 @@ class ConfigManager:
             or ""
         ).strip()
 
-    def get_dialogue_poll_max_tokens(self) -> int:
-        """对话投票生成的最大 token 限制"""
-        value = self._get_nested(
-            ("analysis", "dialogue_poll", "max_tokens"),
-            400,
-            "dialogue_poll_max_tokens",
-        )
-        return self._normalize_int(value, 400, minimum=1)
-
-    def get_dialogue_poll_max_options(self) -> int:
-        """对话投票生成的候选数量"""
-        value = self._get_nested(
-            ("analysis", "dialogue_poll", "max_options"),
-            5,
-            "dialogue_poll_max_options",
-        )
-        return self._normalize_int(value, 5, minimum=2)
+    get_dialogue_poll_max_tokens = _int_getter(
+        ("analysis", "dialogue_poll", "max_tokens"),
+        "dialogue_poll_max_tokens",
+        400,
+        minimum=1,
+        doc="对话投票生成的最大 token 限制",
+    )
+
+    get_dialogue_poll_max_options = _int_getter(
+        ("analysis", "dialogue_poll", "max_options"),
+        "dialogue_poll_max_options",
+        5,
+        minimum=2,
+        doc="对话投票生成的候选数量",
+    )
 
     def get_dialogue_poll_prompt(self) -> str:
-        """对话投票生成的提示词模板"""
+        """对话投票生成的提示词模板（未配置时返回空字符串，由调用方使用
+        dialogue_poll.DEFAULT_DIALOGUE_POLL_PROMPT）"""
         return self._get_nested(
-            ("analysis", "dialogue_poll", "prompt"),
-            """你是群聊文风模仿器。根据下面的聊天记录，生成一个单选投票：给出一个简短的问题 (question)，以及 {option_count} 条候选发言 (options)。候选发言必须是‘嘎啦给目’风格，语气俏皮、有点碎碎念，但不要冒犯。不要@具体用户，不要包含隐私或敏感信息。每条候选发言 6-20 字。只输出 JSON 数组，且只包含一个对象，格式如下：[{\"question\":\"...\",\"options\":[\"...\",\"...\"]}]。\\n\\n聊天记录：\\n{history_text}""",
-            "dialogue_poll_prompt",
+            ("analysis", "dialogue_poll", "prompt"), "", "dialogue_poll_prompt"
         )
 
+    def get_dialogue_poll_provider_id(self) -> str:
+        """获取对话投票专用 Provider ID"""
+        return str(
+            self._get_nested(
+                ("analysis", "dialogue_poll", "provider_id"),
+                "",
+                "dialogue_poll_provider_id",
+            )
+            or ""
+        ).strip()
+
     def get_user_title_provider_id(self) -> str:
         """获取用户称号分析专用 Provider ID"""
         return str(
@@ -424,29 +582,27 @@ class ConfigManager:
             or ""
         ).strip()
 
-    def get_personal_report_max_tokens(self) -> int:
-        """获取个人报告分析最大 token 数"""
-        value = self._get_nested(
-            ("analysis", "personal_report", "max_tokens"),
-            800,
-            "personal_report_max_tokens",
-        )
-        return self._normalize_int(value, 800, minimum=1)
-
-    def get_personal_report_max_messages(self) -> int:
-        """获取个人报告分析的最大消息数"""
-        value = self._get_nested(
-            ("analysis", "personal_report", "max_messages"),
-            100,
-            "personal_report_max_messages",
-        )
-        return self._normalize_int(value, 100, minimum=1)
+    get_personal_report_max_tokens = _int_getter(
+        ("analysis", "personal_report", "max_tokens"),
+        "personal_report_max_tokens",
+        800,
+        minimum=1,
+        doc="获取个人报告分析最大 token 数",
+    )
+
+    get_personal_report_max_messages = _int_getter(
+        ("analysis", "personal_report", "max_messages"),
+        "personal_report_max_messages",
+        100,
+        minimum=1,
+        doc="获取个人报告分析的最大消息数",
+    )
 
     def get_personal_report_prompt(self) -> str:
         """获取个人报告分析提示词模板"""
         # 先尝试从 prompts 对象中获取
         prompts_config = self._get_nested(
-            ("analysis", "personal_report", "prompts"), {}, "personal_report_prompts"
+            ("analysis", "personal_report", "prompts"), None, "personal_report_prompts"
         )
         if isinstance(prompts_config, dict):
             prompt = prompts_config.get("personal_report_prompt")
@@ -460,24 +616,68 @@ class ConfigManager:
         )
         return legacy_prompt or ""
 
+    @property
+    def reports_dir(self):
+        """报告输出目录（固定为插件数据目录），首次访问后不再重新计算"""
+        if self._reports_dir is None:
+            self._reports_dir = get_default_reports_dir()
+        return self._reports_dir
+
     def get_reports_dir(self):
-        """获取报告输出目录（固定为插件数据目录）"""
-        return get_default_reports_dir()
+        """获取报告输出目录（兼容旧接口）"""
+        return self.reports_dir
 
-    def get_bot_matrix_ids(self) -> list:
+    def get_bot_matrix_ids(self) -> tuple[str, ...]:
         """获取 bot matrix 号列表"""
-        return self._get_nested(
-            ("auto_analysis", "bot_matrix_ids"), [], "bot_matrix_ids"
+        return self._get_str_tuple(
+            ("auto_analysis", "bot_matrix_ids"), "bot_matrix_ids"
         )
 
+    def get_show_nicknames(self) -> bool:
+        """是否获取房间成员昵称用于展示"""
+        value = self._get_nested(("output", "show_nicknames"), True, "show_nicknames")
+        return self._normalize_bool(value, True)
+
+    get_avatar_cache_hours = _int_getter(
+        ("output", "avatar_cache_hours"),
+        "avatar_cache_hours",
+        24,
+        minimum=0,
+        doc="获取头像磁盘缓存有效期（小时），0 表示不缓存",
+    )
+
     def get_pdf_filename_format(self) -> str:
         """获取 PDF 文件名格式"""
         return self._get_nested(
             ("output", "pdf", "filename_format"),
-            "群聊分析报告_{group_id}_{date}.pdf",
+            DEFAULT_PDF_FILENAME_FORMAT,
             "pdf_filename_format",
         )
 
+    def _get_prompt(
+        self,
+        prompts_path: tuple[str, ...],
+        style: str,
+        default_style: str,
+        prompts_legacy_key: str,
+        legacy_key: str,
+    ) -> str:
+        """按风格获取提示词（结果按 (配置键, 风格) 缓存，配置修改或重载后失效）"""
+        cache_key = (prompts_legacy_key, style)
+        prompt = self._derived.get(cache_key)
+        if prompt is not None:
+            return prompt
+        prompts_config = self._get_nested(prompts_path, None, prompts_legacy_key)
+        prompt = None
+        # 获取指定的 prompt
+        if isinstance(prompts_config, dict):
+            prompt = prompts_config.get(style) or prompts_config.get(default_style)
+        if not prompt:
+            # 兼容旧配置
+            prompt = self.config.get(legacy_key, "")
+        self._derived[cache_key] = prompt
+        return prompt
+
     def get_topic_analysis_prompt(self, style: str = "topic_prompt") -> str:
         """
         获取话题分析提示词模板
@@ -488,17 +688,13 @@ class ConfigManager:
         Returns:
             提示词模板字符串
         """
-        # 直接从配置中获取 prompts 对象
-        prompts_config = self._get_nested(
-            ("analysis", "topic", "prompts"), {}, "topic_analysis_prompts"
+        return self._get_prompt(
+            ("analysis", "topic", "prompts"),
+            style,
+            "topic_prompt",
+            "topic_analysis_prompts",
+            "topic_analysis_prompt",
         )
-        # 获取指定的 prompt
-        if isinstance(prompts_config, dict):
-            prompt = prompts_config.get(style) or prompts_config.get("topic_prompt")
-            if prompt:
-                return prompt
-        # 兼容旧配置
-        return self.config.get("topic_analysis_prompt", "")
 
     def get_user_title_analysis_prompt(self, style: str = "user_title_prompt") -> str:
         """
@@ -510,19 +706,13 @@ class ConfigManager:
         Returns:
             提示词模板字符串
         """
-        # 直接从配置中获取 prompts 对象
-        prompts_config = self._get_nested(
-            ("analysis", "user_title", "prompts"), {}, "user_title_analysis_prompts"
+        return self._get_prompt(
+            ("analysis", "user_title", "prompts"),
+            style,
+            "user_title_prompt",
+            "user_title_analysis_prompts",
+            "user_title_analysis_prompt",
         )
-        # 获取指定的 prompt
-        if isinstance(prompts_config, dict):
-            prompt = prompts_config.get(style) or prompts_config.get(
-                "user_title_prompt"
-            )
-            if prompt:
-                return prompt
-        # 兼容旧配置
-        return self.config.get("user_title_analysis_prompt", "")
 
     def get_golden_quote_analysis_prompt(
         self, style: str = "golden_quote_prompt"
@@ -536,19 +726,13 @@ class ConfigManager:
         Returns:
             提示词模板字符串
         """
-        # 直接从配置中获取 prompts 对象
-        prompts_config = self._get_nested(
-            ("analysis", "golden_quote", "prompts"), {}, "golden_quote_analysis_prompts"
+        return self._get_prompt(
+            ("analysis", "golden_quote", "prompts"),
+            style,
+            "golden_quote_prompt",
+            "golden_quote_analysis_prompts",
+            "golden_quote_analysis_prompt",
         )
-        # 获取指定的 prompt
-        if isinstance(prompts_config, dict):
-            prompt = prompts_config.get(style) or prompts_config.get(
-                "golden_quote_prompt"
-            )
-            if prompt:
-                return prompt
-        # 兼容旧配置
-        return self.config.get("golden_quote_analysis_prompt", "")
 
     def set_topic_analysis_prompt(self, prompt: str):
         """设置话题分析提示词模板"""
@@ -574,9 +758,12 @@ class ConfigManager:
         """设置群组列表模式"""
         self._set_nested(("group_access", "mode"), mode)
 
-    def set_group_list(self, groups: list[str]):
-        """设置群组列表"""
-        self._set_nested(("group_access", "list"), groups)
+    def set_group_list(self, groups: Iterable[str]):
+        """设置群组列表（写入时统一规范化为非空字符串）"""
+        self._set_nested(
+            ("group_access", "list"),
+            self._normalize_str_list(groups),
+        )
 
     def set_max_concurrent_tasks(self, count: int):
         """设置自动分析最大并发数"""
@@ -603,7 +790,7 @@ class ConfigManager:
             logger.warning(
                 f"尝试设置无效的自动分析时间：{time_str!r}，已回退默认值 09:00"
             )
-            normalized = "09:00"
+            normalized = DEFAULT_AUTO_ANALYSIS_TIME
         self._set_nested(("auto_analysis", "time"), normalized)
 
     @staticmethod
@@ -611,11 +798,7 @@ class ConfigManager:
         raw = str(value or "").strip()
         if not raw:
             return None
-        try:
-            parsed = datetime.strptime(raw, "%H:%M")
-        except ValueError:
-            return None
-        return parsed.strftime("%H:%M")
+        return _parse_hhmm(raw)
 
     def set_enable_auto_analysis(self, enabled: bool):
         """设置是否启用自动分析"""
@@ -663,7 +846,11 @@ class ConfigManager:
 
     def get_report_template(self) -> str:
         """获取报告模板名称"""
-        return self._get_nested(("output", "template"), "scrapbook", "report_template")
+        raw_template = str(
+            self._get_nested(("output", "template"), "scrapbook", "report_template")
+            or ""
+        ).strip()
+        return raw_template or "scrapbook"
 
     def set_report_template(self, template_name: str):
         """设置报告模板名称"""
@@ -671,27 +858,32 @@ class ConfigManager:
 
     @property
     def playwright_available(self) -> bool:
-        """检查 playwright 是否可用"""
+        """检查 playwright 是否可用（首次访问时检查一次，之后读取缓存状态）"""
+        if not self._playwright_checked:
+            self._check_playwright_availability()
         return self._playwright_available
 
     @property
     def playwright_version(self) -> str | None:
         """获取 playwright 版本"""
+        if not self._playwright_checked:
+            self._check_playwright_availability()
         return self._playwright_version
 
-    def _check_playwright_availability(self):
-        """检查 playwright 可用性"""
+    def _check_playwright_availability(self, force: bool = False):
+        """检查 playwright 可用性（探测结果在所有实例间共享，force 时重新探测）"""
+        self._playwright_checked = True
+        probe = ConfigManager._playwright_probe
+        if probe is not None and not force:
+            self._playwright_available, self._playwright_version = probe
+            return
         try:
-            import importlib.util
-
-            if importlib.util.find_spec("playwright") is None:
-                raise ImportError
-
-            # 尝试导入以确保完整性
+            # 直接导入即可判断是否安装，并确保完整性
             import playwright
             from playwright.async_api import async_playwright  # noqa: F401
 
             self._playwright_available = True
+            self._playwright_modules = self._scan_playwright_modules()
 
             # 检查版本
             try:
@@ -707,6 +899,23 @@ class ConfigManager:
             logger.warning(
                 "playwright 未安装，PDF 功能将不可用。请使用 pip install playwright 安装，并运行 playwright install chromium"
             )
+        self._share_playwright_state()
+
+    def _share_playwright_state(self):
+        """将当前 playwright 状态写入类级探测缓存"""
+        ConfigManager._playwright_probe = (
+            self._playwright_available,
+            self._playwright_version,
+        )
+
+    @staticmethod
+    def _scan_playwright_modules() -> tuple[str, ...]:
+        """扫描 sys.modules 中的 playwright 包及其子模块（不含同前缀的其他包）"""
+        return tuple(
+            mod
+            for mod in list(sys.modules)
+            if mod == "playwright" or mod.startswith("playwright.")
+        )
 
     def get_browser_path(self) -> str:
         """获取自定义浏览器路径"""
@@ -718,16 +927,20 @@ class ConfigManager:
 
     def reload_playwright(self) -> bool:
         """重新加载 playwright 模块"""
+        self._playwright_checked = True
         try:
             logger.info("开始重新加载 playwright 模块...")
 
-            # 移除所有 playwright 相关模块
+            # 移除 playwright 包及其子模块；优先使用导入时记录的模块名，
+            # 未记录时才扫描 sys.modules
             modules_to_remove = [
-                mod for mod in sys.modules.keys() if mod.startswith("playwright")
-            ]
+                mod for mod in self._playwright_modules if mod in sys.modules
+            ] or list(self._scan_playwright_modules())
+            # 重新导入后可能懒加载出新的子模块，下次重载时重新扫描
+            self._playwright_modules = ()
             logger.info(f"移除模块：{modules_to_remove}")
             for mod in modules_to_remove:
-                del sys.modules[mod]
+                sys.modules.pop(mod, None)
 
             # 强制重新导入
             try:
@@ -760,6 +973,8 @@ class ConfigManager:
         except Exception as e:
             logger.error(f"重新加载 playwright 时出错：{e}")
             return False
+        finally:
+            self._share_playwright_state()
 
     def save_config(self):
         """保存配置到 AstrBot 配置系统"""
@@ -770,10 +985,11 @@ class ConfigManager:
             logger.error(f"保存配置失败：{e}")
 
     def reload_config(self):
-        """重新加载配置"""
+        """重新加载配置（清除读取缓存，使外部对配置的修改生效）"""
         try:
             # 重新从 AstrBot 配置系统读取所有配置
             logger.info("重新加载配置...")
+            self._invalidate_cache()
             # 配置会自动从 self.config 中重新读取
             logger.info("配置重载完成")
         except Exception as e:
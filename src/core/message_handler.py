@@ -3,35 +3,134 @@
 负责群聊消息的获取、过滤和预处理
 """
 
-from collections import defaultdict
+import asyncio
+import sys
+import time
+import weakref
 from datetime import datetime, timedelta
+from functools import lru_cache
 
 from astrbot.api import logger
 
 from ...src.models.data_models import EmojiStatistics, GroupStatistics, TokenUsage
-from ...src.utils.time_utils import get_hour_from_timestamp
+from ...src.utils.time_utils import get_hours_from_timestamps
 from ...src.visualization.activity_charts import ActivityVisualizer
 
 
+@lru_cache(maxsize=1024, typed=True)
+def _interned_face_key(prefix: str, face_id) -> str:
+    return sys.intern(f"{prefix}_{face_id}")
+
+
+def _face_key(prefix: str, face_id) -> str:
+    """表情统计键（表情 ID 重复率高，格式化结果缓存并驻留）"""
+    try:
+        return _interned_face_key(prefix, face_id)
+    except TypeError:
+        # 不可哈希的 ID 直接格式化
+        return f"{prefix}_{face_id}"
+
+
+def _count_text(data: dict, emoji_statistics: EmojiStatistics) -> int:
+    return len(data.get("text", ""))
+
+
+def _count_face(data: dict, emoji_statistics: EmojiStatistics) -> int:
+    # matrix 基础表情
+    emoji_statistics.face_count += 1
+    face_key = _face_key("face", data.get("id", "unknown"))
+    emoji_statistics.face_details[face_key] += 1
+    return 0
+
+
+def _count_mface(data: dict, emoji_statistics: EmojiStatistics) -> int:
+    # 动画表情/魔法表情
+    emoji_statistics.mface_count += 1
+    face_key = _face_key("mface", data.get("emoji_id", "unknown"))
+    emoji_statistics.face_details[face_key] += 1
+    return 0
+
+
+def _count_bface(data: dict, emoji_statistics: EmojiStatistics) -> int:
+    # 超级表情
+    emoji_statistics.bface_count += 1
+    face_key = _face_key("bface", data.get("p", "unknown"))
+    emoji_statistics.face_details[face_key] += 1
+    return 0
+
+
+def _count_sface(data: dict, emoji_statistics: EmojiStatistics) -> int:
+    # 小表情
+    emoji_statistics.sface_count += 1
+    face_key = _face_key("sface", data.get("id", "unknown"))
+    emoji_statistics.face_details[face_key] += 1
+    return 0
+
+
+def _count_image(data: dict, emoji_statistics: EmojiStatistics) -> int:
+    # 检查是否是动画表情（通过 summary 字段判断），普通图片不计入表情统计
+    summary = data.get("summary", "")
+    if "动画表情" in summary or "表情" in summary:
+        # 动画表情（以 image 形式发送）
+        emoji_statistics.mface_count += 1
+        face_key = _face_key("animated", data.get("file", "unknown"))
+        emoji_statistics.face_details[face_key] += 1
+    return 0
+
+
+def _count_media(data: dict, emoji_statistics: EmojiStatistics) -> int:
+    # 其他可能的表情类型：键或值中含有 emoji 字样（逐项检查，不整体 repr 字典）
+    for key, value in data.items():
+        if type(value) is not str:
+            value = str(value)
+        if "emoji" in value.lower() or "emoji" in str(key).lower():
+            emoji_statistics.other_emoji_count += 1
+            break
+    return 0
+
+
+# calculate_statistics 按消息段类型分派的处理函数，返回计入总字数的字符数
+_CONTENT_HANDLERS = {
+    "text": _count_text,
+    "face": _count_face,
+    "mface": _count_mface,
+    "bface": _count_bface,
+    "sface": _count_sface,
+    "image": _count_image,
+    "record": _count_media,
+    "video": _count_media,
+}
+
+
 class MessageHandler:
     """消息处理器"""
 
     _MAX_ANALYSIS_DAYS = 31
+    # 房间成员昵称缓存有效期（秒）
+    _DISPLAY_NAME_TTL = 3600.0
 
     def __init__(self, config_manager, bot_manager=None):
         self.config_manager = config_manager
-        self.activity_visualizer = ActivityVisualizer()
+        # 仅 calculate_statistics 需要，首次使用时再创建
+        self._activity_visualizer: ActivityVisualizer | None = None
         self.bot_manager = bot_manager
+        # 房间 ID -> (获取时间, {用户 ID: 昵称})
+        self._display_name_cache: dict[str, tuple[float, dict[str, str]]] = {}
+        self._display_name_locks: dict[str, asyncio.Lock] = {}
+        # bot 实例 -> matrix 号；弱引用键，实例被替换后条目自动释放
+        self._bot_id_cache: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+
+    @property
+    def activity_visualizer(self) -> ActivityVisualizer:
+        if self._activity_visualizer is None:
+            self._activity_visualizer = ActivityVisualizer()
+        return self._activity_visualizer
 
     async def set_bot_matrix_ids(self, bot_matrix_ids):
         """设置机器人 matrix 号（支持单个 matrix 号或 matrix 号列表）"""
         try:
             if self.bot_manager:
-                # 确保传入的是列表，保持统一处理
-                if isinstance(bot_matrix_ids, list):
-                    self.bot_manager.set_bot_matrix_ids(bot_matrix_ids)
-                elif bot_matrix_ids:
-                    self.bot_manager.set_bot_matrix_ids([bot_matrix_ids])
+                self.bot_manager.set_bot_matrix_ids(bot_matrix_ids)
             logger.info(f"设置机器人 matrix 号：{bot_matrix_ids}")
         except Exception as e:
             logger.error(f"设置机器人 matrix 号失败：{e}")
@@ -41,14 +140,27 @@ class MessageHandler:
         self.bot_manager = bot_manager
 
     def _extract_bot_matrix_id_from_instance(self, bot_instance):
-        """从 bot 实例中提取 matrix 号（单个）"""
+        """从 bot 实例中提取 matrix 号（单个），成功结果按实例缓存"""
+        try:
+            cached = self._bot_id_cache.get(bot_instance)
+        except TypeError:
+            # 不支持弱引用的实例不缓存
+            cached = None
+        if cached is not None:
+            return cached
+        bot_matrix_id = None
         if hasattr(bot_instance, "self_id") and bot_instance.self_id:
-            return str(bot_instance.self_id)
+            bot_matrix_id = str(bot_instance.self_id)
         elif hasattr(bot_instance, "matrix") and bot_instance.matrix:
-            return str(bot_instance.matrix)
+            bot_matrix_id = str(bot_instance.matrix)
         elif hasattr(bot_instance, "user_id") and bot_instance.user_id:
-            return str(bot_instance.user_id)
-        return None
+            bot_matrix_id = str(bot_instance.user_id)
+        if bot_matrix_id:
+            try:
+                self._bot_id_cache[bot_instance] = bot_matrix_id
+            except TypeError:
+                pass
+        return bot_matrix_id
 
     async def fetch_group_messages(
         self, bot_instance, group_id: str, days: int, platform_id: str | None = None
@@ -115,31 +227,28 @@ class MessageHandler:
             logger.info(f"正在从 Matrix 获取消息，limit={limit}")
 
             # 获取群成员列表以填充昵称
-            display_names = {}
-            try:
-                client = (
-                    bot_instance.api if hasattr(bot_instance, "api") else bot_instance
-                )
-                if hasattr(client, "get_room_members"):
-                    members_resp = await client.get_room_members(group_id)
-                    member_events = members_resp.get("chunk", [])
-                    for event in member_events:
-                        if event.get("type") == "m.room.member":
-                            user_id = event.get("state_key")
-                            content = event.get("content", {})
-                            displayname = content.get("displayname")
-                            if user_id and displayname:
-                                display_names[user_id] = displayname
-            except Exception as e:
-                logger.warning(f"获取群成员列表失败，将无法显示昵称：{e}")
+            client = bot_instance.api if hasattr(bot_instance, "api") else bot_instance
+            display_names = (
+                await self._get_display_names(client, group_id)
+                if self.config_manager.get_show_nicknames()
+                else {}
+            )
 
             # 使用 room_messages 分页获取历史消息（direction='b' 往后翻页）
-            client = bot_instance.api if hasattr(bot_instance, "api") else bot_instance
             if hasattr(client, "room_messages"):
                 from_token = None
                 remaining = limit
                 page_size = min(200, max(1, remaining))
                 reached_start = False
+                # 循环内不变的判断提前取出；bot 过滤直接做集合成员测试
+                bot_ids = (
+                    self.bot_manager.bot_matrix_id_set
+                    if self.bot_manager
+                    else frozenset()
+                )
+                threading_enabled = self.config_manager.get_threading_enabled()
+                # 同一发送者的消息共享一个 sender 字典（下游只读）
+                sender_infos: dict[str, dict] = {}
 
                 while remaining > 0 and not reached_start:
                     response = await client.room_messages(
@@ -158,34 +267,34 @@ class MessageHandler:
                         if event.get("type") != "m.room.message":
                             continue
 
-                        # 检查时间
+                        # 检查时间（倒序返回，遇到过旧的消息即可结束）
                         ts = event.get("origin_server_ts", 0)
                         if ts < start_ts:
                             reached_start = True
-                            continue  # 太旧的消息
+                            break
                         if ts > end_ts:
                             continue
 
-                        content = event.get("content", {})
+                        # 过滤机器人自己的消息（在解析内容前判断）
                         sender = event.get("sender")
-                        event_id = str(event.get("event_id", "") or "")
-
-                        # 过滤机器人自己的消息
-                        if (
-                            self.bot_manager
-                            and self.bot_manager.should_filter_bot_message(sender)
-                        ):
+                        if sender in bot_ids:
                             continue
 
+                        content = event.get("content", {})
+                        event_id = str(event.get("event_id", "") or "")
+
                         # 获取昵称
-                        nickname = display_names.get(sender, sender)
+                        sender_info = sender_infos.get(sender)
+                        if sender_info is None:
+                            sender_info = sender_infos[sender] = {
+                                "user_id": sender,
+                                "nickname": display_names.get(sender, sender),
+                            }
 
                         relation_type = ""
                         thread_root_id = ""
                         reply_event_id = ""
-                        if self.config_manager.get_threading_enabled() and isinstance(
-                            content, dict
-                        ):
+                        if threading_enabled and isinstance(content, dict):
                             relates_to = content.get("m.relates_to", {})
                             if isinstance(relates_to, dict):
                                 relation_type = str(relates_to.get("rel_type", "") or "")
@@ -210,51 +319,41 @@ class MessageHandler:
                                             reply.get("event_id", "") or ""
                                         )
 
-                        # 转换消息格式
-                        msg_dict = {
-                            "time": ts / 1000,
-                            "sender": {"user_id": sender, "nickname": nickname},
-                            "message": [],
-                            "event_id": event_id,
-                            "relation_type": relation_type,
-                            "thread_root_id": thread_root_id,
-                            "reply_event_id": reply_event_id,
-                        }
-
-                        msg_type = content.get("msgtype")
-                        if msg_type == "m.text":
-                            msg_dict["message"].append(
-                                {
+                        # 转换消息格式（每条事件只产生一个内容段）
+                        match content.get("msgtype"):
+                            case "m.text":
+                                segment = {
                                     "type": "text",
                                     "data": {"text": content.get("body", "")},
                                 }
-                            )
-                        elif msg_type == "m.image":
-                            msg_dict["message"].append(
-                                {
+                            case "m.image":
+                                segment = {
                                     "type": "image",
                                     "data": {"file": content.get("url", "")},
                                 }
-                            )
-                        else:
-                            # 其他类型作为文本处理
-                            msg_dict["message"].append(
-                                {
+                            case msg_type:
+                                # 其他类型作为文本处理
+                                segment = {
                                     "type": "text",
                                     "data": {
                                         "text": f"[{msg_type}] {content.get('body', '')}"
                                     },
                                 }
-                            )
-
+                        message_items = [segment]
                         if reply_event_id:
-                            msg_dict["message"].append(
-                                {
-                                    "type": "reply",
-                                    "data": {"id": reply_event_id},
-                                }
+                            message_items.append(
+                                {"type": "reply", "data": {"id": reply_event_id}}
                             )
 
+                        msg_dict = {
+                            "time": ts / 1000,
+                            "sender": sender_info,
+                            "message": message_items,
+                            "event_id": event_id,
+                            "relation_type": relation_type,
+                            "thread_root_id": thread_root_id,
+                            "reply_event_id": reply_event_id,
+                        }
                         messages.append(msg_dict)
                         remaining -= 1
                         if remaining <= 0:
@@ -275,24 +374,68 @@ class MessageHandler:
             logger.error(f"Matrix 获取消息失败：{e}", exc_info=True)
             return []
 
+    async def _get_display_names(self, client, group_id: str) -> dict[str, str]:
+        """获取房间成员昵称映射，按房间缓存 _DISPLAY_NAME_TTL 秒"""
+        cached = self._display_name_cache.get(group_id)
+        if cached and time.monotonic() - cached[0] < self._DISPLAY_NAME_TTL:
+            return cached[1]
+
+        lock = self._display_name_locks.get(group_id)
+        if lock is None:
+            lock = self._display_name_locks[group_id] = asyncio.Lock()
+        async with lock:
+            # 等待锁期间其他任务可能已完成获取
+            cached = self._display_name_cache.get(group_id)
+            if cached and time.monotonic() - cached[0] < self._DISPLAY_NAME_TTL:
+                return cached[1]
+
+            display_names = {}
+            try:
+                if not hasattr(client, "get_room_members"):
+                    return display_names
+                members_resp = await client.get_room_members(group_id)
+                member_events = members_resp.get("chunk", [])
+                for event in member_events:
+                    if event.get("type") == "m.room.member":
+                        user_id = event.get("state_key")
+                        content = event.get("content", {})
+                        displayname = content.get("displayname")
+                        if user_id and displayname:
+                            display_names[user_id] = displayname
+            except Exception as e:
+                # 获取失败时不缓存，下次重试
+                logger.warning(f"获取群成员列表失败，将无法显示昵称：{e}")
+                return display_names
+
+            self._display_name_cache[group_id] = (time.monotonic(), display_names)
+            return display_names
+
     def calculate_statistics(self, messages: list[dict]) -> GroupStatistics:
         """计算基础统计数据"""
         total_chars = 0
         participants = set()
-        hour_counts = defaultdict(int)
+        # 小时取值固定为 0-23，直接用定长列表计数
+        hour_counts = [0] * 24
         emoji_statistics = EmojiStatistics()
 
-        for msg in messages:
+        # 批量预先计算每条消息的小时，避免逐条构造 datetime
+        hours = get_hours_from_timestamps(
+            msg.get("time", 0) if isinstance(msg, dict) else 0 for msg in messages
+        )
+
+        # 循环中频繁调用的方法绑定为局部变量
+        add_participant = participants.add
+        get_handler = _CONTENT_HANDLERS.get
+
+        for msg, hour in zip(messages, hours):
             if not isinstance(msg, dict):
                 continue
             sender = msg.get("sender", {})
             if not isinstance(sender, dict):
                 continue
-            sender_id = str(sender.get("user_id", ""))
-            participants.add(sender_id)
+            add_participant(str(sender.get("user_id", "")))
 
             # 统计时间分布
-            hour = get_hour_from_timestamp(msg.get("time", 0))
             hour_counts[hour] += 1
 
             # 处理消息内容
@@ -302,74 +445,23 @@ class MessageHandler:
             for content in message_items:
                 if not isinstance(content, dict):
                     continue
+                handler = get_handler(content.get("type"))
+                if handler is None:
+                    continue
                 data = content.get("data", {})
                 if not isinstance(data, dict):
                     data = {}
-                if content.get("type") == "text":
-                    text = data.get("text", "")
-                    total_chars += len(text)
-                elif content.get("type") == "face":
-                    # matrix 基础表情
-                    emoji_statistics.face_count += 1
-                    face_id = data.get("id", "unknown")
-                    emoji_statistics.face_details[f"face_{face_id}"] = (
-                        emoji_statistics.face_details.get(f"face_{face_id}", 0) + 1
-                    )
-                elif content.get("type") == "mface":
-                    # 动画表情/魔法表情
-                    emoji_statistics.mface_count += 1
-                    emoji_id = data.get("emoji_id", "unknown")
-                    emoji_statistics.face_details[f"mface_{emoji_id}"] = (
-                        emoji_statistics.face_details.get(f"mface_{emoji_id}", 0) + 1
-                    )
-                elif content.get("type") == "bface":
-                    # 超级表情
-                    emoji_statistics.bface_count += 1
-                    emoji_id = data.get("p", "unknown")
-                    emoji_statistics.face_details[f"bface_{emoji_id}"] = (
-                        emoji_statistics.face_details.get(f"bface_{emoji_id}", 0) + 1
-                    )
-                elif content.get("type") == "sface":
-                    # 小表情
-                    emoji_statistics.sface_count += 1
-                    emoji_id = data.get("id", "unknown")
-                    emoji_statistics.face_details[f"sface_{emoji_id}"] = (
-                        emoji_statistics.face_details.get(f"sface_{emoji_id}", 0) + 1
-                    )
-                elif content.get("type") == "image":
-                    # 检查是否是动画表情（通过 summary 字段判断）
-                    summary = data.get("summary", "")
-                    if "动画表情" in summary or "表情" in summary:
-                        # 动画表情（以 image 形式发送）
-                        emoji_statistics.mface_count += 1
-                        file_name = data.get("file", "unknown")
-                        emoji_statistics.face_details[f"animated_{file_name}"] = (
-                            emoji_statistics.face_details.get(
-                                f"animated_{file_name}", 0
-                            )
-                            + 1
-                        )
-                    else:
-                        # 普通图片，不计入表情统计
-                        pass
-                elif (
-                    content.get("type") in ["record", "video"]
-                    and "emoji" in str(data).lower()
-                ):
-                    # 其他可能的表情类型
-                    emoji_statistics.other_emoji_count += 1
+                total_chars += handler(data, emoji_statistics)
 
         # 找出最活跃时段
-        most_active_hour = (
-            max(hour_counts.items(), key=lambda x: x[1])[0] if hour_counts else 0
-        )
+        most_active_hour = max(range(24), key=hour_counts.__getitem__)
         most_active_period = (
             f"{most_active_hour:02d}:00-{(most_active_hour + 1) % 24:02d}:00"
         )
 
         # 生成活跃度可视化数据
         activity_visualization = (
-            self.activity_visualizer.generate_activity_visualization(messages)
+            self.activity_visualizer.generate_activity_visualization(messages, hours)
         )
 
         return GroupStatistics(
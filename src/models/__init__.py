@@ -7,7 +7,15 @@ from .data_models import (
     GroupStatistics,
     SummaryTopic,
     TokenUsage,
+    UserStat,
     UserTitle,
 )
 
-__all__ = ["SummaryTopic", "UserTitle", "GoldenQuote", "TokenUsage", "GroupStatistics"]
+__all__ = [
+    "SummaryTopic",
+    "UserTitle",
+    "UserStat",
+    "GoldenQuote",
+    "TokenUsage",
+    "GroupStatistics",
+]
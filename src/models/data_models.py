@@ -3,6 +3,7 @@
 包含所有分析相关的数据结构
 """
 
+from collections import Counter
 from dataclasses import dataclass, field
 
 
@@ -40,6 +41,19 @@ class GoldenQuote:
     reply_event_id: str = ""
 
 
+@dataclass(slots=True)
+class UserStat:
+    """单个用户的活跃度统计"""
+
+    message_count: int = 0
+    char_count: int = 0
+    emoji_count: int = 0
+    reply_count: int = 0
+    thread_message_count: int = 0
+    nickname: str = ""
+    hours: list[int] = field(default_factory=lambda: [0] * 24)  # 按小时的消息数
+
+
 @dataclass
 class TokenUsage:
     """Token 使用统计"""
@@ -58,7 +72,8 @@ class EmojiStatistics:
     bface_count: int = 0  # 超级表情数量
     sface_count: int = 0  # 小表情数量
     other_emoji_count: int = 0  # 其他表情数量
-    face_details: dict = field(default_factory=dict)  # 具体表情 ID 统计 {face_id: count}
+    # 具体表情 ID 统计 {face_id: count}，Counter 缺失键按 0 计，可直接 += 1
+    face_details: Counter[str] = field(default_factory=Counter)
 
     @property
     def total_emoji_count(self) -> int:
@@ -3,7 +3,8 @@
 包含 HTML、PDF、文本报告生成功能
 """
 
+from .avatar_cache import AvatarCache
 from .generators import ReportGenerator
 from .templates import HTMLTemplates
 
-__all__ = ["ReportGenerator", "HTMLTemplates"]
+__all__ = ["ReportGenerator", "HTMLTemplates", "AvatarCache"]
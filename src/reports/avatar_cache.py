@@ -0,0 +1,72 @@
+"""
+头像磁盘缓存模块
+按 user_id 持久化头像 data URI，跨日报告复用，避免重复下载与 base64 编码
+"""
+
+import asyncio
+import hashlib
+import os
+import threading
+import time
+from pathlib import Path
+
+from astrbot.api import logger
+
+
+class AvatarCache:
+    """头像磁盘缓存（文件名为 user_id 的 sha1，以文件 mtime 判断是否过期）"""
+
+    def __init__(self, cache_dir: Path | str):
+        self.cache_dir = Path(cache_dir)
+        self._last_prune: float | None = None
+
+    def _path(self, user_id: str) -> Path:
+        digest = hashlib.sha1(user_id.encode("utf-8")).hexdigest()
+        return self.cache_dir / f"{digest}.txt"
+
+    def _get_sync(self, user_id: str, ttl_seconds: float) -> str | None:
+        path = self._path(user_id)
+        try:
+            if time.time() - path.stat().st_mtime > ttl_seconds:
+                return None
+            return path.read_text(encoding="utf-8") or None
+        except FileNotFoundError:
+            return None
+
+    def _put_sync(self, user_id: str, avatar: str) -> None:
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        path = self._path(user_id)
+        # 先写临时文件再替换，避免并发读取到写了一半的内容；
+        # 临时文件名带线程 id，避免同一用户的并发写入共用临时文件
+        tmp_path = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp_path.write_text(avatar, encoding="utf-8")
+        os.replace(tmp_path, path)
+
+    def _prune_sync(self, ttl_seconds: float) -> None:
+        """删除过期的缓存文件"""
+        deadline = time.time() - ttl_seconds
+        for path in self.cache_dir.glob("*.txt"):
+            try:
+                if path.stat().st_mtime < deadline:
+                    path.unlink()
+            except FileNotFoundError:
+                continue
+
+    async def get(self, user_id: str, ttl_seconds: float) -> str | None:
+        """读取未过期的头像，未命中或出错时返回 None"""
+        try:
+            return await asyncio.to_thread(self._get_sync, user_id, ttl_seconds)
+        except Exception as e:
+            logger.debug(f"读取头像缓存失败 {user_id}: {e}")
+            return None
+
+    async def put(self, user_id: str, avatar: str, ttl_seconds: float) -> None:
+        """写入头像，并按有效期周期性清理过期文件"""
+        try:
+            await asyncio.to_thread(self._put_sync, user_id, avatar)
+            now = time.monotonic()
+            if self._last_prune is None or now - self._last_prune >= ttl_seconds:
+                self._last_prune = now
+                await asyncio.to_thread(self._prune_sync, ttl_seconds)
+        except Exception as e:
+            logger.debug(f"写入头像缓存失败 {user_id}: {e}")
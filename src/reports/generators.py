@@ -10,6 +10,7 @@ from pathlib import Path
 from astrbot.api import logger
 
 from ..visualization.activity_charts import ActivityVisualizer
+from .avatar_cache import AvatarCache
 from .templates import HTMLTemplates
 
 
@@ -20,6 +21,14 @@ class ReportGenerator:
         self.config_manager = config_manager
         self.activity_visualizer = ActivityVisualizer()
         self.html_templates = HTMLTemplates(config_manager)  # 实例化 HTML 模板管理器
+        # PDF 转换复用的常驻浏览器，首次生成 PDF 时启动
+        self._playwright = None
+        self._browser = None
+        self._browser_lock = asyncio.Lock()
+        # 头像磁盘缓存，与报告目录同级
+        self.avatar_cache = AvatarCache(
+            Path(config_manager.get_reports_dir()).parent / "avatar_cache"
+        )
 
     async def generate_image_report(
         self, analysis_result: dict, group_id: str, html_render_func, avatar_getter=None
@@ -40,8 +49,9 @@ class ReportGenerator:
             )
 
             # 先渲染 HTML 模板（使用异步方法）
-            image_template = await self.html_templates.get_image_template_async()
-            html_content = self._render_html_template(image_template, render_payload)
+            html_content = await self.html_templates.render_image_template(
+                render_payload
+            )
 
             # 检查 HTML 内容是否有效
             if not html_content:
@@ -144,8 +154,7 @@ class ReportGenerator:
             logger.info(f"PDF 渲染数据准备完成，包含 {len(render_data)} 个字段")
 
             # 生成 HTML 内容（使用异步方法）
-            pdf_template = await self.html_templates.get_pdf_template_async()
-            html_content = self._render_html_template(pdf_template, render_data)
+            html_content = await self.html_templates.render_pdf_template(render_data)
 
             # 检查 HTML 内容是否有效
             if not html_content:
@@ -223,7 +232,7 @@ class ReportGenerator:
         user_titles = analysis_result["user_titles"]
         activity_viz = stats.activity_visualization
 
-        # 使用 Jinja2 模板构建话题 HTML（批量渲染）
+        # 话题、称号、金句列表直接交给主模板，由其 include 子模板一次渲染
         max_topics = self.config_manager.get_max_topics()
         topics_list = []
         for i, topic in enumerate(topics[:max_topics], 1):
@@ -235,38 +244,43 @@ class ReportGenerator:
                 }
             )
 
-        topics_html = self.html_templates.render_template(
-            "topic_item.html", topics=topics_list
+        # 并发获取称号与金句的头像，总耗时取决于最慢的一次请求而非逐个累加；
+        # 同一用户常同时出现在称号和金句中，按 user_id 去重后只请求一次
+        max_user_titles = self.config_manager.get_max_user_titles()
+        max_golden_quotes = self.config_manager.get_max_golden_quotes()
+        shown_titles = user_titles[:max_user_titles]
+        shown_quotes = stats.golden_quotes[:max_golden_quotes]
+        avatar_ids = list(
+            dict.fromkeys(
+                [str(title.matrix) for title in shown_titles]
+                + [str(quote.matrix) for quote in shown_quotes if quote.matrix]
+            )
         )
-        logger.info(f"话题 HTML 生成完成，长度：{len(topics_html)}")
+        results = await asyncio.gather(
+            *(self._get_user_avatar(user_id, avatar_getter) for user_id in avatar_ids),
+            return_exceptions=True,
+        )
+        avatars = {
+            user_id: None if isinstance(result, BaseException) else result
+            for user_id, result in zip(avatar_ids, results)
+        }
 
-        # 使用 Jinja2 模板构建用户称号 HTML（批量渲染，包含头像）
-        max_user_titles = self.config_manager.get_max_user_titles()
+        # 用户称号（包含头像）
         titles_list = []
-        for title in user_titles[:max_user_titles]:
-            # 获取用户头像
-            avatar_data = await self._get_user_avatar(str(title.matrix), avatar_getter)
+        for title in shown_titles:
             title_data = {
                 "name": title.name,
                 "title": title.title,
                 "mbti": title.mbti,
                 "reason": title.reason,
-                "avatar_data": avatar_data,
+                "avatar_data": avatars[str(title.matrix)],
             }
             titles_list.append(title_data)
 
-        titles_html = self.html_templates.render_template(
-            "user_title_item.html", titles=titles_list
-        )
-        logger.info(f"用户称号 HTML 生成完成，长度：{len(titles_html)}")
-
-        # 使用 Jinja2 模板构建金句 HTML（批量渲染）
-        max_golden_quotes = self.config_manager.get_max_golden_quotes()
+        # 金句
         quotes_list = []
-        for quote in stats.golden_quotes[:max_golden_quotes]:
-            avatar_url = (
-                await self._get_user_avatar(str(quote.matrix), avatar_getter) if quote.matrix else None
-            )
+        for quote in shown_quotes:
+            avatar_url = avatars[str(quote.matrix)] if quote.matrix else None
             quotes_list.append(
                 {
                     "content": quote.content,
@@ -280,11 +294,6 @@ class ReportGenerator:
                 }
             )
 
-        quotes_html = self.html_templates.render_template(
-            "quote_item.html", quotes=quotes_list
-        )
-        logger.info(f"金句 HTML 生成完成，长度：{len(quotes_html)}")
-
         # 生成活跃度可视化 HTML
         chart_data = self.activity_visualizer.get_hourly_chart_data(
             activity_viz.hourly_activity
@@ -303,9 +312,9 @@ class ReportGenerator:
             "total_characters": stats.total_characters,
             "emoji_count": stats.emoji_count,
             "most_active_period": stats.most_active_period,
-            "topics_html": topics_html,
-            "titles_html": titles_html,
-            "quotes_html": quotes_html,
+            "topics": topics_list,
+            "titles": titles_list,
+            "quotes": quotes_list,
             "hourly_chart_html": hourly_chart_html,
             "total_tokens": stats.token_usage.total_tokens
             if stats.token_usage.total_tokens
@@ -321,37 +330,20 @@ class ReportGenerator:
         logger.info(f"渲染数据准备完成，包含 {len(render_data)} 个字段")
         return render_data
 
-    def _render_html_template(self, template: str, data: dict) -> str:
-        """HTML 模板渲染，使用 {{key}} 占位符格式
-
-        Args:
-            template: HTML 模板字符串
-            data: 渲染数据字典
-        """
-        result = template
-
-        for key, value in data.items():
-            # 统一使用双大括号格式 {{key}}
-            placeholder = "{{" + key + "}}"
-            result = result.replace(placeholder, str(value))
-
-        # 检查是否还有未替换的占位符
-        import re
-
-        if remaining_placeholders := re.findall(r"\{\{[^}]+\}\}", result):
-            logger.warning(
-                f"未替换的占位符 ({len(remaining_placeholders)}个): {remaining_placeholders[:10]}"
-            )
-
-        return result
-
     async def _get_user_avatar(self, user_id: str, avatar_getter=None) -> str | None:
         """获取用户头像的 base64 编码"""
         try:
             if avatar_getter:
+                ttl_seconds = self.config_manager.get_avatar_cache_hours() * 3600
+                if ttl_seconds > 0:
+                    cached = await self.avatar_cache.get(user_id, ttl_seconds)
+                    if cached:
+                        return cached
                 try:
                     avatar = await avatar_getter(user_id)
                     if avatar:
+                        if ttl_seconds > 0:
+                            await self.avatar_cache.put(user_id, avatar, ttl_seconds)
                         return avatar
                 except Exception as e:
                     logger.warning(f"Avatar getter failed for {user_id}: {e}")
@@ -362,169 +354,203 @@ class ReportGenerator:
             logger.error(f"获取用户头像失败 {user_id}: {e}")
             return None
 
-    async def _html_to_pdf(self, html_content: str, output_path: str) -> bool:
-        """将 HTML 内容转换为 PDF 文件"""
-        try:
-            # 动态导入 playwright
-            try:
-                from playwright.async_api import async_playwright
-            except ImportError:
-                logger.error("playwright 未安装，无法生成 PDF")
-                logger.info("💡 请尝试运行：pip install playwright")
-                return False
+    async def _launch_browser(self, p):
+        """按配置路径、系统浏览器、Playwright 托管浏览器的顺序启动 Chromium"""
+        import os
+        import sys
 
-            import os
-            import sys
+        executable_path = None
 
-            logger.info("启动浏览器进行 PDF 转换 (使用 Playwright)")
+        # 0. 优先检查配置的自定义路径
+        custom_browser_path = self.config_manager.get_browser_path()
+        if custom_browser_path:
+            if Path(custom_browser_path).exists():
+                logger.info(f"使用配置的自定义浏览器路径：{custom_browser_path}")
+                executable_path = custom_browser_path
+            else:
+                logger.warning(
+                    f"配置的浏览器路径不存在：{custom_browser_path}，尝试自动检测..."
+                )
+
+        # 1. 如果没有自定义路径，尝试自动检测系统浏览器
+        if not executable_path:
+            system_browser_paths = []
+            if sys.platform.startswith("win"):
+                username = os.environ.get("USERNAME", "")
+                local_app_data = os.environ.get(
+                    "LOCALAPPDATA", rf"C:\Users\{username}\AppData\Local"
+                )
+                program_files = os.environ.get("ProgramFiles", r"C:\Program Files")
+                program_files_x86 = os.environ.get(
+                    "ProgramFiles(x86)", r"C:\Program Files (x86)"
+                )
+
+                system_browser_paths = [
+                    os.path.join(
+                        program_files, r"Google\Chrome\Application\chrome.exe"
+                    ),
+                    os.path.join(
+                        program_files_x86,
+                        r"Google\Chrome\Application\chrome.exe",
+                    ),
+                    os.path.join(
+                        local_app_data, r"Google\Chrome\Application\chrome.exe"
+                    ),
+                    os.path.join(
+                        program_files_x86,
+                        r"Microsoft\Edge\Application\msedge.exe",
+                    ),
+                    os.path.join(
+                        program_files, r"Microsoft\Edge\Application\msedge.exe"
+                    ),
+                ]
+            elif sys.platform.startswith("linux"):
+                system_browser_paths = [
+                    "/usr/bin/google-chrome",
+                    "/usr/bin/google-chrome-stable",
+                    "/usr/bin/chromium",
+                    "/usr/bin/chromium-browser",
+                    "/snap/bin/chromium",
+                ]
+            elif sys.platform.startswith("darwin"):
+                system_browser_paths = [
+                    "/Applications/Google Chrome.app/Contents/MacOS/Google Chrome",
+                    "/Applications/Microsoft Edge.app/Contents/MacOS/Microsoft Edge",
+                    "/Applications/Chromium.app/Contents/MacOS/Chromium",
+                ]
+
+            # 尝试找到可用的系统浏览器
+            for path in system_browser_paths:
+                if Path(path).exists():
+                    executable_path = path
+                    logger.info(f"使用系统浏览器：{path}")
+                    break
+
+        # 定义默认启动参数
+        launch_kwargs = {
+            "headless": True,
+            "args": [
+                "--no-sandbox",
+                "--disable-setuid-sandbox",
+                "--font-render-hinting=none",
+            ],
+        }
 
-            async with async_playwright() as p:
-                browser = None
+        if executable_path:
+            launch_kwargs["executable_path"] = executable_path
+            launch_kwargs["channel"] = (
+                "chrome" if "chrome" in executable_path.lower() else "msedge"
+            )
 
-                executable_path = None
+        try:
+            if executable_path:
+                # 如果指定了路径，通常使用 chromium 启动
+                return await p.chromium.launch(**launch_kwargs)
+            else:
+                # 尝试直接启动，依赖 playwright install
+                logger.info("尝试启动 Playwright 托管的浏览器...")
+                return await p.chromium.launch(
+                    headless=True, args=launch_kwargs["args"]
+                )
 
-                # 0. 优先检查配置的自定义路径
-                custom_browser_path = self.config_manager.get_browser_path()
-                if custom_browser_path:
-                    if Path(custom_browser_path).exists():
-                        logger.info(
-                            f"使用配置的自定义浏览器路径：{custom_browser_path}"
-                        )
-                        executable_path = custom_browser_path
-                    else:
-                        logger.warning(
-                            f"配置的浏览器路径不存在：{custom_browser_path}，尝试自动检测..."
-                        )
-
-                # 1. 如果没有自定义路径，尝试自动检测系统浏览器
-                if not executable_path:
-                    system_browser_paths = []
-                    if sys.platform.startswith("win"):
-                        username = os.environ.get("USERNAME", "")
-                        local_app_data = os.environ.get(
-                            "LOCALAPPDATA", rf"C:\Users\{username}\AppData\Local"
-                        )
-                        program_files = os.environ.get(
-                            "ProgramFiles", r"C:\Program Files"
-                        )
-                        program_files_x86 = os.environ.get(
-                            "ProgramFiles(x86)", r"C:\Program Files (x86)"
-                        )
-
-                        system_browser_paths = [
-                            os.path.join(
-                                program_files, r"Google\Chrome\Application\chrome.exe"
-                            ),
-                            os.path.join(
-                                program_files_x86,
-                                r"Google\Chrome\Application\chrome.exe",
-                            ),
-                            os.path.join(
-                                local_app_data, r"Google\Chrome\Application\chrome.exe"
-                            ),
-                            os.path.join(
-                                program_files_x86,
-                                r"Microsoft\Edge\Application\msedge.exe",
-                            ),
-                            os.path.join(
-                                program_files, r"Microsoft\Edge\Application\msedge.exe"
-                            ),
-                        ]
-                    elif sys.platform.startswith("linux"):
-                        system_browser_paths = [
-                            "/usr/bin/google-chrome",
-                            "/usr/bin/google-chrome-stable",
-                            "/usr/bin/chromium",
-                            "/usr/bin/chromium-browser",
-                            "/snap/bin/chromium",
-                        ]
-                    elif sys.platform.startswith("darwin"):
-                        system_browser_paths = [
-                            "/Applications/Google Chrome.app/Contents/MacOS/Google Chrome",
-                            "/Applications/Microsoft Edge.app/Contents/MacOS/Microsoft Edge",
-                            "/Applications/Chromium.app/Contents/MacOS/Chromium",
-                        ]
-
-                    # 尝试找到可用的系统浏览器
-                    for path in system_browser_paths:
-                        if Path(path).exists():
-                            executable_path = path
-                            logger.info(f"使用系统浏览器：{path}")
-                            break
-
-                # 定义默认启动参数
-                launch_kwargs = {
-                    "headless": True,
-                    "args": [
-                        "--no-sandbox",
-                        "--disable-setuid-sandbox",
-                        "--font-render-hinting=none",
-                    ],
-                }
+        except Exception as e:
+            logger.warning(f"浏览器启动失败：{e}")
+            if "Executable doesn't exist" in str(e) or "executable at" in str(e):
+                logger.error("未找到可用的浏览器。")
+                logger.info(
+                    "💡 请确保已安装 Playwright 浏览器：playwright install chromium"
+                )
+                logger.info("💡 或者安装 Google Chrome / Microsoft Edge")
+            return None
 
-                if executable_path:
-                    launch_kwargs["executable_path"] = executable_path
-                    launch_kwargs["channel"] = (
-                        "chrome" if "chrome" in executable_path.lower() else "msedge"
-                    )
+    async def _get_browser(self):
+        """获取常驻浏览器，首次调用或连接断开时启动，多份报告复用同一浏览器"""
+        async with self._browser_lock:
+            if self._browser is not None and self._browser.is_connected():
+                return self._browser
 
-                try:
-                    if executable_path:
-                        # 如果指定了路径，通常使用 chromium 启动
-                        browser = await p.chromium.launch(**launch_kwargs)
-                    else:
-                        # 尝试直接启动，依赖 playwright install
-                        logger.info("尝试启动 Playwright 托管的浏览器...")
-                        browser = await p.chromium.launch(
-                            headless=True, args=launch_kwargs["args"]
-                        )
+            await self._close_browser()
 
-                except Exception as e:
-                    logger.warning(f"浏览器启动失败：{e}")
-                    if "Executable doesn't exist" in str(e) or "executable at" in str(
-                        e
-                    ):
-                        logger.error("未找到可用的浏览器。")
-                        logger.info(
-                            "💡 请确保已安装 Playwright 浏览器：playwright install chromium"
-                        )
-                        logger.info("💡 或者安装 Google Chrome / Microsoft Edge")
-                    return False
-
-                if not browser:
-                    return False
+            from playwright.async_api import async_playwright
 
-                try:
-                    context = await browser.new_context(device_scale_factor=1)
-                    page = await context.new_page()
+            logger.info("启动浏览器进行 PDF 转换 (使用 Playwright)")
+            self._playwright = await async_playwright().start()
+            self._browser = await self._launch_browser(self._playwright)
+            if self._browser is None:
+                await self._close_browser()
+            return self._browser
+
+    async def _close_browser(self):
+        """关闭浏览器并停止 Playwright（调用方需持有 _browser_lock）"""
+        browser, self._browser = self._browser, None
+        playwright, self._playwright = self._playwright, None
+        if browser is not None:
+            try:
+                await browser.close()
+            except Exception as e:
+                logger.debug(f"关闭浏览器失败：{e}")
+        if playwright is not None:
+            try:
+                await playwright.stop()
+            except Exception as e:
+                logger.debug(f"停止 Playwright 失败：{e}")
 
-                    # 设置页面内容
-                    await page.set_content(
-                        html_content, wait_until="networkidle", timeout=60000
-                    )
+    async def aclose(self):
+        """释放常驻浏览器，插件停用时调用"""
+        async with self._browser_lock:
+            await self._close_browser()
 
-                    # 生成 PDF
-                    logger.info("开始生成 PDF...")
-                    await page.pdf(
-                        path=output_path,
-                        format="A4",
-                        print_background=True,
-                        margin={
-                            "top": "10mm",
-                            "right": "10mm",
-                            "bottom": "10mm",
-                            "left": "10mm",
-                        },
-                    )
-                    logger.info(f"PDF 生成成功：{output_path}")
-                    return True
+    async def _html_to_pdf(self, html_content: str, output_path: str) -> bool:
+        """将 HTML 内容转换为 PDF 文件"""
+        try:
+            # 动态导入 playwright
+            try:
+                import playwright.async_api  # noqa: F401
+            except ImportError:
+                logger.error("playwright 未安装，无法生成 PDF")
+                logger.info("💡 请尝试运行：pip install playwright")
+                return False
 
-                except Exception as e:
-                    logger.error(f"PDF 生成过程出错：{e}")
-                    return False
-                finally:
-                    if browser:
-                        await browser.close()
+            browser = await self._get_browser()
+            if not browser:
+                return False
+
+            # 每份报告只新建独立的 context，浏览器本身跨报告复用
+            context = None
+            try:
+                context = await browser.new_context(device_scale_factor=1)
+                page = await context.new_page()
+
+                # 设置页面内容
+                await page.set_content(
+                    html_content, wait_until="networkidle", timeout=60000
+                )
+
+                # 生成 PDF
+                logger.info("开始生成 PDF...")
+                await page.pdf(
+                    path=output_path,
+                    format="A4",
+                    print_background=True,
+                    margin={
+                        "top": "10mm",
+                        "right": "10mm",
+                        "bottom": "10mm",
+                        "left": "10mm",
+                    },
+                )
+                logger.info(f"PDF 生成成功：{output_path}")
+                return True
+
+            except Exception as e:
+                logger.error(f"PDF 生成过程出错：{e}")
+                return False
+            finally:
+                if context is not None:
+                    try:
+                        await context.close()
+                    except Exception as e:
+                        logger.debug(f"关闭浏览器 context 失败：{e}")
 
         except Exception as e:
             logger.error(f"Playwright 运行出错：{e}")
@@ -7,7 +7,12 @@ import asyncio
 import os
 import threading
 
-from jinja2 import Environment, FileSystemLoader, select_autoescape
+from jinja2 import (
+    Environment,
+    FileSystemBytecodeCache,
+    FileSystemLoader,
+    select_autoescape,
+)
 
 from astrbot.api import logger
 
@@ -23,6 +28,20 @@ class HTMLTemplates:
         # 缓存不同模板的 Jinja2 环境（多线程安全）
         self._envs = {}
         self._env_lock = threading.Lock()
+        # 编译后的模板字节码缓存，进程重启后免去重新解析与编译
+        self._bytecode_cache = self._create_bytecode_cache()
+
+    def _create_bytecode_cache(self) -> FileSystemBytecodeCache | None:
+        """创建模板字节码缓存（位于插件数据目录，与报告目录同级），不可用时不使用缓存"""
+        try:
+            cache_dir = os.path.join(
+                os.path.dirname(self.config_manager.get_reports_dir()), "jinja_cache"
+            )
+            os.makedirs(cache_dir, exist_ok=True)
+            return FileSystemBytecodeCache(directory=cache_dir)
+        except Exception as e:
+            logger.warning(f"创建模板字节码缓存失败，将不使用缓存：{e}")
+            return None
 
     def _get_env_sync(self) -> Environment:
         """获取当前配置的模板环境（同步版本，供 asyncio.to_thread 调用）"""
@@ -44,6 +63,7 @@ class HTMLTemplates:
             autoescape=select_autoescape(["html", "xml"]),
             trim_blocks=True,
             lstrip_blocks=True,
+            bytecode_cache=self._bytecode_cache,
         )
 
         # 使用双重检查锁定，避免在高并发下重复创建相同 template_name 的 env
@@ -63,55 +83,28 @@ class HTMLTemplates:
         """获取当前配置的模板环境（同步版本，向后兼容）"""
         return self._get_env_sync()
 
-    def _read_template_file_sync(self, filename: str) -> str:
-        """同步读取模板文件内容"""
-        with open(filename, encoding="utf-8") as f:
-            return f.read()
-
-    async def get_image_template_async(self) -> str:
-        """获取图片报告的 HTML 模板（异步版本，返回原始模板字符串）"""
-        try:
-            env = await self._get_env_async()
-            template = env.get_template("image_template.html")
-            return await asyncio.to_thread(
-                self._read_template_file_sync, template.filename
-            )
-        except Exception as e:
-            logger.error(f"加载图片模板失败：{e}")
-            return ""
-
-    def get_image_template(self) -> str:
-        """获取图片报告的 HTML 模板（同步版本，向后兼容）"""
-        try:
-            env = self._get_env()
-            template = env.get_template("image_template.html")
-            with open(template.filename, encoding="utf-8") as f:
-                return f.read()
-        except Exception as e:
-            logger.error(f"加载图片模板失败：{e}")
-            return ""
+    def _render_sync(self, template_file: str, data: dict) -> str:
+        """使用缓存环境中的已编译模板渲染（同步版本，供 asyncio.to_thread 调用）"""
+        # Environment 会缓存编译后的 Template，重复渲染不再读盘和解析
+        env = self._get_env_sync()
+        return env.get_template(template_file).render(data)
 
-    async def get_pdf_template_async(self) -> str:
-        """获取 PDF 报告的 HTML 模板（异步版本，返回原始模板字符串）"""
+    async def render_image_template(self, data: dict) -> str:
+        """渲染图片报告的 HTML"""
         try:
-            env = await self._get_env_async()
-            template = env.get_template("pdf_template.html")
             return await asyncio.to_thread(
-                self._read_template_file_sync, template.filename
+                self._render_sync, "image_template.html", data
             )
         except Exception as e:
-            logger.error(f"加载 PDF 模板失败：{e}")
+            logger.error(f"渲染图片模板失败：{e}")
             return ""
 
-    def get_pdf_template(self) -> str:
-        """获取 PDF 报告的 HTML 模板（同步版本，向后兼容）"""
+    async def render_pdf_template(self, data: dict) -> str:
+        """渲染 PDF 报告的 HTML"""
         try:
-            env = self._get_env()
-            template = env.get_template("pdf_template.html")
-            with open(template.filename, encoding="utf-8") as f:
-                return f.read()
+            return await asyncio.to_thread(self._render_sync, "pdf_template.html", data)
         except Exception as e:
-            logger.error(f"加载 PDF 模板失败：{e}")
+            logger.error(f"渲染 PDF 模板失败：{e}")
             return ""
 
     def render_template(self, template_name: str, **kwargs) -> str:
@@ -54,11 +54,7 @@ class AutoScheduler:
 
     def set_bot_matrix_ids(self, bot_matrix_ids):
         """设置 bot matrix 号（支持单个 matrix 号或 matrix 号列表）"""
-        # 确保传入的是列表，保持统一处理
-        if isinstance(bot_matrix_ids, list):
-            self.bot_manager.set_bot_matrix_ids(bot_matrix_ids)
-        elif bot_matrix_ids:
-            self.bot_manager.set_bot_matrix_ids([bot_matrix_ids])
+        self.bot_manager.set_bot_matrix_ids(bot_matrix_ids)
 
     @staticmethod
     def _build_target_time(now: datetime, time_text: str) -> datetime | None:
@@ -5,12 +5,18 @@
 
 from .helpers import MessageAnalyzer
 from .pdf_utils import PDFInstaller
-from .time_utils import format_timestamp_hm, get_hour_from_timestamp, parse_timestamp
+from .time_utils import (
+    format_timestamp_hm,
+    get_hour_from_timestamp,
+    get_hours_from_timestamps,
+    parse_timestamp,
+)
 
 __all__ = [
     "PDFInstaller",
     "MessageAnalyzer",
     "parse_timestamp",
     "get_hour_from_timestamp",
+    "get_hours_from_timestamps",
     "format_timestamp_hm",
 ]
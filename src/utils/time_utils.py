@@ -3,9 +3,13 @@ Time parsing helpers.
 """
 
 import math
+from collections.abc import Iterable
 from datetime import datetime
 from typing import Any
 
+# 本地时区偏移均为 15 分钟的整数倍，同一刻钟内的本地小时数必然相同
+_QUARTER_HOUR_SECONDS = 900
+
 
 def parse_timestamp(value: Any) -> datetime | None:
     """Parse a value into a local datetime, returning None on invalid input."""
@@ -31,6 +35,31 @@ def get_hour_from_timestamp(value: Any, default: int = 0) -> int:
     return parsed.hour
 
 
+def get_hours_from_timestamps(values: Iterable[Any], default: int = 0) -> list[int]:
+    """Batch version of get_hour_from_timestamp.
+
+    Each quarter-hour bucket is resolved through datetime only once.
+    """
+    hours: list[int] = []
+    bucket_hours: dict[int, int] = {}
+    for value in values:
+        try:
+            timestamp = float(value)
+        except (TypeError, ValueError):
+            hours.append(default)
+            continue
+        if not math.isfinite(timestamp):
+            hours.append(default)
+            continue
+        bucket = int(timestamp // _QUARTER_HOUR_SECONDS)
+        hour = bucket_hours.get(bucket)
+        if hour is None:
+            hour = get_hour_from_timestamp(bucket * _QUARTER_HOUR_SECONDS, default)
+            bucket_hours[bucket] = hour
+        hours.append(hour)
+    return hours
+
+
 def format_timestamp_hm(value: Any, default: str = "00:00") -> str:
     """Format timestamp-like input to HH:MM."""
     parsed = parse_timestamp(value)
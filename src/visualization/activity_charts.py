@@ -6,7 +6,7 @@
 from collections import defaultdict
 
 from ..models.data_models import ActivityVisualization
-from ..utils.time_utils import get_hour_from_timestamp
+from ..utils.time_utils import get_hours_from_timestamps
 
 
 class ActivityVisualizer:
@@ -16,19 +16,28 @@ class ActivityVisualizer:
         pass
 
     def generate_activity_visualization(
-        self, messages: list[dict]
+        self, messages: list[dict], hours: list[int] | None = None
     ) -> ActivityVisualization:
-        """生成活跃度可视化数据 - 专注于小时级别分析"""
+        """生成活跃度可视化数据 - 专注于小时级别分析
+
+        Args:
+            messages: 消息列表
+            hours: 与 messages 一一对应的小时（调用方已计算时传入，避免重复换算）
+        """
         hourly_activity = defaultdict(int)
         user_activity = defaultdict(int)
         emoji_activity = defaultdict(int)  # 每小时表情统计
 
+        # 时间分析 - 只关注小时
+        if hours is None:
+            hours = get_hours_from_timestamps(
+                msg.get("time", 0) if isinstance(msg, dict) else 0 for msg in messages
+            )
+
         # 分析消息数据
-        for msg in messages:
+        for msg, hour in zip(messages, hours):
             if not isinstance(msg, dict):
                 continue
-            # 时间分析 - 只关注小时
-            hour = get_hour_from_timestamp(msg.get("time", 0))
 
             # # 用户分析
             # sender = msg.get("sender", {})